@@ -0,0 +1,50 @@
+# Measures misc.batch: spots per second for growing inputs of random flop, turn and river spots, with the peak
+# resident memory of this process after each size (it should stay flat), against scoring each spot on its own
+# with best_hand and simulate_equity.
+# Run from the repository root: python -m benchmarks.batch [--spots 1000 10000 100000] [--workers N]
+import argparse
+import random
+import resource
+import time
+
+from misc.batch import analyze
+from misc.deck import Deck
+from misc.equity import simulate_equity
+from misc.hand_evaluator import HandEvaluator
+
+
+def random_spots(count, seed):
+    # Generated lazily, so the input never sits in memory either
+    rng = random.Random(seed)
+    for _ in range(count):
+        deck = Deck(rng)
+        yield deck.deal(2), deck.deal(rng.choice((3, 4, 5)))
+
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spots", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--trials", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--no-outs", action="store_true")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    spots = list(random_spots(200, args.seed))
+    start = time.perf_counter()
+    for hand, board in spots:
+        HandEvaluator.best_hand(hand, board)
+        simulate_equity(hand, board, args.trials, exact_threshold=0)
+    print(f"one spot at a time: {len(spots) / (time.perf_counter() - start):,.0f} spots/s")
+
+    for count in args.spots:
+        start = time.perf_counter()
+        done = 0
+        for _ in analyze(random_spots(count, args.seed), args.trials, args.seed, args.workers, outs=not args.no_outs):
+            done += 1
+        elapsed = time.perf_counter() - start
+        print(f"{done:>9,} spots: {done / elapsed:,.0f} spots/s, peak memory {peak_mb():,.0f} MB")
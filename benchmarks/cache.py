@@ -0,0 +1,36 @@
+# Measures equity cache hit latency and how often random spots collide once suits are canonicalized.
+# Run from the repository root: python -m benchmarks.cache [--spots N]
+import argparse
+import random
+import time
+
+from misc.deck import Deck
+from misc.equity import simulate_equity
+from misc.equity_cache import EquityCache
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spots", type=int, default=20000)
+    parser.add_argument("--board", type=int, default=3, help="community cards per spot")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    cache = EquityCache()
+    spots = []
+    for _ in range(args.spots):
+        deck = Deck(rng)
+        spots.append((deck.deal(2), deck.deal(args.board)))
+        cache.put(*spots[-1], 0.5, 1000)
+    print(f"{args.spots} random spots fill {len(cache.entries)} entries after suit canonicalization")
+
+    cache.hits = cache.misses = 0
+    start = time.perf_counter()
+    for hole, board in spots:
+        cache.get(hole, board)
+    elapsed = time.perf_counter() - start
+    print(f"hit latency: {elapsed / args.spots * 1e6:.2f} us, stats {cache.stats()}")
+
+    hole, board = spots[0]
+    fresh = [simulate_equity(hole, board, 100000, seed=seed) for seed in range(5)]
+    print(f"fresh simulations of one spot: {min(fresh):.4f}-{max(fresh):.4f}")
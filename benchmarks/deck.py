@@ -0,0 +1,82 @@
+# Measures dealing: deals per second and memory allocated per deal for the old full-shuffle deck, random.sample
+# over a list of live cards, Deck and Dealer.deal_into, then the same for a whole serial equity trial.
+# Allocations are the peak tracemalloc growth over one deal or trial, averaged; floats and small ints come from
+# free lists and do not count.
+# Run from the repository root: python -m benchmarks.deck [--deals N]
+import argparse
+import random
+import time
+import tracemalloc
+
+from misc.deck import CARDS, Dealer, Deck
+from misc.equity import live_cards, serial_counts
+from misc.hand_evaluator import BoardState
+
+
+def old_deck(rng, dead_cards, num_cards):
+    # Deck() as it was: every card created and shuffled, then the dead cards filtered out
+    cards = list(CARDS)
+    rng.shuffle(cards)
+    cards = [card for card in cards if card not in dead_cards]
+    return [cards.pop() for _ in range(num_cards)]
+
+
+def sampled_trial(hero_state, board_state, live, missing, rng):
+    # serial_counts' trial as it was: random.sample, then slices for the runout
+    drawn = rng.sample(live, 2 + missing)
+    return hero_state.evaluate(drawn[2:]) > board_state.evaluate(drawn)
+
+
+def allocated(function, repeats):
+    # Mean peak bytes allocated by one call
+    total = 0
+    tracemalloc.start()
+    for _ in range(repeats):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        function()
+        total += tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return total / repeats
+
+
+def report(name, function, deals):
+    function()
+    start = time.perf_counter()
+    for _ in range(deals):
+        function()
+    rate = deals / (time.perf_counter() - start)
+    print(f"{name:>30}: {rate:>11,.0f}/s, {allocated(function, 2000):>6,.0f} bytes allocated each")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--deals", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    hand, board = Deck(rng).deal(2), []
+    board = Deck(rng, hand).deal(3)
+    dead = hand + board
+    dead_set, live = set(dead), live_cards(dead)
+    dealer = Dealer(dead, rng)
+    drawn, runout = [0] * 4, [0] * 2
+    print(f"7 cards for {hand} on {board}: the opponent's hand and the runout")
+    report("old Deck", lambda: old_deck(rng, dead_set, 4), args.deals)
+    report("random.sample", lambda: rng.sample(live, 4), args.deals)
+    report("Deck.deal", lambda: Deck(rng, dead).deal(4), args.deals)
+    report("Dealer.deal_into", lambda: dealer.deal_into(drawn, runout), args.deals)
+
+    board_state = BoardState(board)
+    hero_state = board_state.add(hand)
+    report("trial with random.sample", lambda: sampled_trial(hero_state, board_state, live, 2, rng), args.deals)
+
+    def trial():
+        dealer.deal_into(drawn, runout)
+        return hero_state.evaluate(runout) > board_state.evaluate(drawn)
+
+    report("trial with Dealer", trial, args.deals)
+    start = time.perf_counter()
+    serial_counts(hand, board, args.deals, random.Random(args.seed))
+    print(f"{'serial_counts':>30}: {args.deals / (time.perf_counter() - start):>11,.0f} trials/s")
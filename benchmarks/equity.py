@@ -0,0 +1,59 @@
+# Measures equity simulation throughput on each street.
+# Run from the repository root: python -m benchmarks.equity [--trials N]
+import argparse
+import random
+import time
+
+from misc.deck import CARDS, Deck
+from misc.equity import batch_counts, serial_counts
+from misc.hand_evaluator import HandEvaluator, np
+
+STREETS = [("preflop", 0), ("flop", 3), ("turn", 4), ("river", 5)]
+
+
+def original_simulation(bot_hand, community_cards, num_simulations, rng):
+    # The simulate_hand loop as it was before the lookup tables: a fresh, fully shuffled deck and
+    # best_hand_enumerated per trial
+    dead_cards = set(bot_hand + community_cards)
+    bot_wins = 0
+    for _ in range(num_simulations):
+        cards = list(CARDS)
+        rng.shuffle(cards)
+        cards = [card for card in cards if card not in dead_cards]
+        opponent_hand = [cards.pop() for _ in range(2)]
+        cc = community_cards + [cards.pop() for _ in range(5 - len(community_cards))]
+        if HandEvaluator.best_hand_enumerated(bot_hand, cc) > HandEvaluator.best_hand_enumerated(opponent_hand, cc):
+            bot_wins += 1
+    return bot_wins / num_simulations
+
+
+def spot(rng, board_size):
+    deck = Deck(rng)
+    return deck.deal(2), deck.deal(board_size)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    HandEvaluator.evaluate(Deck().deal(7))
+
+    for street, board_size in STREETS:
+        hand, board = spot(rng, board_size)
+        original = 200 / timed(original_simulation, hand, board, 200, rng)
+        serial = 20000 / timed(serial_counts, hand, board, 20000, rng)
+        line = f"{street:>7}: original {original:>9,.0f} trials/s, serial {serial:>9,.0f} trials/s"
+        if np is not None:
+            generator = np.random.default_rng(args.seed)
+            batch_counts(hand, board, 1000, generator)  # Build the array tables outside the timed run
+            elapsed = timed(batch_counts, hand, board, args.trials, generator)
+            line += f", numpy {args.trials / elapsed:>11,.0f} trials/s ({args.trials:,} trials in {elapsed * 1000:.0f} ms vs {1000 / original * 1000:.0f} ms for 1,000 original)"
+        print(line)
@@ -0,0 +1,131 @@
+# Validates the lookup-table evaluator and measures its throughput.
+# Run from the repository root: python -m benchmarks.evaluator [--validate] [--samples N]
+import argparse
+import random
+import time
+from collections import Counter
+from itertools import combinations
+
+from misc.deck import Deck
+from misc.hand_evaluator import HandEvaluator, strength_category
+
+# Known counts of each category over all 2,598,960 five-card hands
+FIVE_CARD_FREQUENCIES = [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 40]
+DISTINCT_FIVE_CARD_HANDS = 7462
+
+
+def reference_five(hand):
+    # Plain textbook scoring of exactly five cards, used to check the ordering of the tables
+    ranks = sorted((HandEvaluator.card_rank(card) for card in hand), reverse=True)
+    flush = len(set(card.suit for card in hand)) == 1
+    if ranks == [14, 5, 4, 3, 2]:
+        ranks = [5, 4, 3, 2, 1]
+    straight = len(set(ranks)) == 5 and ranks[0] - ranks[4] == 4
+    groups = sorted(Counter(ranks).items(), key=lambda item: (item[1], item[0]), reverse=True)
+    shape = [count for _, count in groups]
+    ordered = [rank for rank, _ in groups]
+    if straight and flush:
+        return (8, ranks)
+    if shape == [4, 1]:
+        return (7, ordered)
+    if shape == [3, 2]:
+        return (6, ordered)
+    if flush:
+        return (5, ranks)
+    if straight:
+        return (4, ranks)
+    if shape == [3, 1, 1]:
+        return (3, ordered)
+    if shape == [2, 2, 1]:
+        return (2, ordered)
+    if shape == [2, 1, 1, 1]:
+        return (1, ordered)
+    return (0, ranks)
+
+
+def reference_best(cards):
+    return max(reference_five(list(hand)) for hand in combinations(cards, 5))
+
+
+def validate_exhaustive():
+    frequencies = [0] * 9
+    distinct = set()
+    for hand in combinations(Deck().cards, 5):
+        strength = HandEvaluator.evaluate(hand)
+        frequencies[strength_category(strength)] += 1
+        distinct.add(strength)
+    print(f"5-card category counts: {frequencies}")
+    print(f"5-card distinct strengths: {len(distinct)}")
+    return frequencies == FIVE_CARD_FREQUENCIES and len(distinct) == DISTINCT_FIVE_CARD_HANDS
+
+
+def validate_random(samples, num_cards, rng):
+    order_errors = 0
+    legacy_mismatches = 0
+    wheel_mismatches = 0
+    previous = None
+    for _ in range(samples):
+        deck = Deck(rng)
+        cards = deck.deal(num_cards)
+        strength = HandEvaluator.evaluate(cards)
+        reference = reference_best(cards)
+
+        # Every pair of consecutive samples must be ordered the same way by both evaluators
+        if previous is not None:
+            prev_strength, prev_reference = previous
+            if (strength > prev_strength) != (reference > prev_reference) or (strength == prev_strength) != (reference == prev_reference):
+                order_errors += 1
+        previous = (strength, reference)
+
+        legacy = HandEvaluator.best_hand_enumerated(cards[:2], cards[2:])
+        if legacy[0] != strength_category(strength):
+            # The original predicates do not recognise A-2-3-4-5 straights
+            if reference[1][0] == 5 and reference[0] in (4, 8):
+                wheel_mismatches += 1
+            else:
+                legacy_mismatches += 1
+    print(f"{num_cards} cards, {samples} samples: {order_errors} ordering errors, "
+          f"{legacy_mismatches} category mismatches vs best_hand_enumerated, {wheel_mismatches} explained by wheel straights")
+    return order_errors == 0 and legacy_mismatches == 0
+
+
+def benchmark(samples, rng):
+    for num_cards in (5, 6, 7):
+        hands = []
+        for _ in range(samples):
+            deck = Deck(rng)
+            hands.append(deck.deal(num_cards))
+
+        HandEvaluator.evaluate(hands[0])  # Build the tables outside the timed loop
+        start = time.perf_counter()
+        for hand in hands:
+            HandEvaluator.evaluate(hand)
+        table_rate = samples / (time.perf_counter() - start)
+
+        legacy_hands = hands[:max(1, samples // 50)]
+        start = time.perf_counter()
+        for hand in legacy_hands:
+            HandEvaluator.best_hand_enumerated(hand[:2], hand[2:])
+        legacy_rate = len(legacy_hands) / (time.perf_counter() - start)
+
+        print(f"{num_cards} cards: evaluate {table_rate:,.0f}/s, best_hand_enumerated {legacy_rate:,.0f}/s ({table_rate / legacy_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--validate", action="store_true", help="check against the reference evaluators before benchmarking")
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    start = time.perf_counter()
+    HandEvaluator.evaluate(Deck().deal(7))
+    print(f"Table build: {time.perf_counter() - start:.2f}s")
+
+    if args.validate:
+        ok = validate_exhaustive()
+        for num_cards in (5, 6, 7):
+            ok = validate_random(args.samples // 10, num_cards, rng) and ok
+        print("Validation passed" if ok else "Validation FAILED")
+    benchmark(args.samples, rng)
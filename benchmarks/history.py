@@ -0,0 +1,65 @@
+# Measures hand-history logging: hands/s appended by HandHistoryWriter, hands/s decoded by iterating a
+# HandHistoryReader, and the time to aggregate whole columns through its NumPy views.
+# Run from the repository root: python -m benchmarks.history [--hands N]
+import argparse
+import os
+import tempfile
+import time
+
+from misc.engine import Table
+from misc.history import HandHistoryReader, HandHistoryWriter, summary
+from misc.player import RandomPlayer
+
+STACK = 1000
+
+
+def play_hands(hands, seed):
+    # Finished hand states, with what the writer reads off the players saved alongside each one
+    player1, player2 = RandomPlayer("Random 1", STACK, seed=seed), RandomPlayer("Random 2", STACK, seed=seed + 1)
+    table = Table(player1, player2, STACK / 100, STACK / 50, seed=seed)
+    played = []
+    for _ in range(hands):
+        player1.chips = player2.chips = STACK
+        state = table.play_hand()
+        played.append((state, (player1.hand, player2.hand), (player1.folded, player2.folded),
+                       (player1.chips, player2.chips)))
+    return played
+
+
+def write(path, played, hands):
+    # Replays the played hands until `hands` records have been appended
+    writer = HandHistoryWriter(path)
+    start = time.perf_counter()
+    for i in range(hands):
+        state, hole, folded, chips = played[i % len(played)]
+        for player, cards, fold, stack in zip((state.player1, state.player2), hole, folded, chips):
+            player.hand, player.folded, player.chips = cards, fold, stack
+        writer.start_stacks = (STACK, STACK)
+        writer.record(state)
+    writer.close()
+    return hands / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hands", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=5000, help="distinct hands played, then replayed")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    played = play_hands(args.distinct, args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "hands.log")
+        rate = write(path, played, args.hands)
+        size = os.path.getsize(path) + os.path.getsize(path + ".actions")
+        print(f"write: {rate:,.0f} hands/s, {size / args.hands:.1f} bytes/hand")
+
+        with HandHistoryReader(path) as reader:
+            start = time.perf_counter()
+            actions = sum(len(record.actions) for record in reader)
+            elapsed = time.perf_counter() - start
+            print(f"iterate: {len(reader) / elapsed:,.0f} hands/s ({actions:,} actions)")
+
+            start = time.perf_counter()
+            stats = summary(reader)
+            print(f"columns summary: {(time.perf_counter() - start) * 1000:.1f} ms for {stats['hands']:,} hands")
@@ -0,0 +1,54 @@
+# Measures the multi-way paths: equity against 1 to 8 random hands (trials and hands scored per second), the
+# showdown scored on a shared board against scoring each hand on its own, and RingTable hands per second from 2
+# to 9 seats.
+# Run from the repository root: python -m benchmarks.multiway [--trials N]
+import argparse
+import random
+import time
+
+from misc.deck import Deck
+from misc.engine import MAX_SEATS, RingTable, showdown_strengths
+from misc.equity import multiway_equity
+from misc.hand_evaluator import HandEvaluator, np
+from misc.player import RandomPlayer
+
+STACK = 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=100000 if np is not None else 2000)
+    parser.add_argument("--hands", type=int, default=2000, help="RingTable hands per table size")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    deck = Deck(random.Random(args.seed))
+    hero, board = deck.deal(2), deck.deal(3)
+    multiway_equity(hero, board, 1, 1000, args.seed)  # Build the lookup tables outside the timings
+    print(f"{hero} on {board}, {args.trials} trials")
+    for opponents in range(1, MAX_SEATS):
+        start = time.perf_counter()
+        equity = multiway_equity(hero, board, opponents, args.trials, args.seed)
+        seconds = time.perf_counter() - start
+        print(f"  {opponents} opponents: equity {equity:.4f}, {args.trials / seconds:,.0f} trials/s, "
+              f"{args.trials * (opponents + 1) / seconds:,.0f} hands scored/s")
+
+    deck = Deck(random.Random(args.seed))
+    hands, board = [deck.deal(2) for _ in range(MAX_SEATS)], deck.deal(5)
+    for name, showdown in (("shared board", lambda: showdown_strengths(hands, board)),
+                           ("one hand at a time", lambda: [HandEvaluator.evaluate(hand + board) for hand in hands]),
+                           ("best_hand", lambda: [HandEvaluator.best_hand(hand, board) for hand in hands])):
+        start = time.perf_counter()
+        for _ in range(2000):
+            showdown()
+        print(f"{MAX_SEATS}-way showdown, {name}: {(time.perf_counter() - start) / 2000 * 1e6:,.1f} us")
+
+    for seats in range(2, MAX_SEATS + 1):
+        players = [RandomPlayer(f"Random {i}", STACK, seed=i) for i in range(seats)]
+        table = RingTable(players, STACK / 100, STACK / 50, seed=args.seed)
+        start = time.perf_counter()
+        for _ in range(args.hands):
+            for player in players:
+                player.chips = STACK
+            table.play_hand()
+        print(f"{seats} seats: {args.hands / (time.perf_counter() - start):,.0f} hands/s")
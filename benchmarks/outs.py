@@ -0,0 +1,62 @@
+# Measures exact outs counting (misc.outs.find_outs) per call on the flop and turn, and shows the exact one- and
+# two-card odds next to the old heuristic's on a few common draws.
+# Run from the repository root: python -m benchmarks.outs [--spots N]
+import argparse
+import random
+import time
+
+from misc.deck import CARDS, Deck
+from misc.hand_evaluator import HandEvaluator, np
+from misc.history import SUIT_LETTERS
+from misc.outs import find_outs
+
+DRAWS = {  # hand, board
+    "flush draw": ("Ah Kh", "2h 7h Qc"),
+    "open-ended straight draw": ("9s 8s", "7d 6c 2h"),
+    "gutshot": ("9s 8s", "Jd 5c 2h"),
+    "combo draw": ("Jh Th", "9h 8c 2h"),
+    "backdoors only": ("Ac Kd", "7h 5c 2s"),
+    "pocket pair": ("8c 8d", "Kh 7s 2c"),
+}
+
+
+def parse(text):
+    # "Ah Td" -> cards
+    return [CARDS["23456789TJQKA".index(card[0]) * 4 + SUIT_LETTERS.index(card[1])] for card in text.split()]
+
+
+def heuristic(hand, board):
+    # The odds calc_outs gave before: 9 outs per four-flush, 8 per four-rank window, always over two cards
+    cards = hand + board
+    suits = [card & 3 for card in cards]
+    ranks = sorted({card >> 2 for card in cards})
+    outs = 9 * sum(suits.count(suit) == 4 for suit in range(4))
+    outs += 8 * sum(ranks[i + 3] - ranks[i] == 3 for i in range(len(ranks) - 3))
+    return 1 - (1 - outs / (52 - len(cards))) ** 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spots", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    HandEvaluator.evaluate(parse("2c 3d 4h 5s 7c"))  # Build the lookup tables outside the timings
+    if np is not None:
+        HandEvaluator.evaluate_batch(np.array([parse("2c 3d 4h 5s 7c")]))
+    rng = random.Random(args.seed)
+    for street, known in (("flop", 3), ("turn", 4)):
+        spots = []
+        for _ in range(args.spots):
+            deck = Deck(rng)
+            spots.append((deck.deal(2), deck.deal(known)))
+        start = time.perf_counter()
+        for hand, board in spots:
+            find_outs(hand, board)
+        print(f"{street}: {(time.perf_counter() - start) / args.spots * 1e6:,.0f} us per spot")
+
+    for name, (hand, board) in DRAWS.items():
+        hand, board = parse(hand), parse(board)
+        outs = find_outs(hand, board)
+        print(f"{name:>25}: {len(outs.cards):2d} outs, next card {outs.next_card:.1%}, by the river "
+              f"{outs.by_river:.1%} (heuristic {heuristic(hand, board):.1%})")
@@ -0,0 +1,34 @@
+# Measures how the parallel equity backend scales with the number of worker processes.
+# Run from the repository root: python -m benchmarks.parallel [--trials N] [--workers 1 2 4 8]
+import argparse
+import os
+import time
+
+from misc.deck import Card
+from misc.equity import counts, parallel_counts, shutdown_pool
+
+HAND = [Card('♠', 'A'), Card('♥', 'K')]
+BOARD = [Card('♠', '7'), Card('♦', '8'), Card('♠', '2')]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=2000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} CPUs available")
+
+    counts(HAND, BOARD, 1000, args.seed)  # Build the tables outside the timed run
+    start = time.perf_counter()
+    counts(HAND, BOARD, args.trials, args.seed)
+    serial = time.perf_counter() - start
+    print(f"serial: {args.trials / serial:,.0f} trials/s")
+
+    for workers in args.workers:
+        parallel_counts(HAND, BOARD, workers * 1000, args.seed, workers)  # Start the pool and build its tables
+        start = time.perf_counter()
+        wins, ties = parallel_counts(HAND, BOARD, args.trials, args.seed, workers)
+        elapsed = time.perf_counter() - start
+        equity = (wins + 0.5 * ties) / args.trials
+        print(f"{workers} workers: {args.trials / elapsed:,.0f} trials/s, speedup {serial / elapsed:.2f}x, equity {equity:.4f}")
+    shutdown_pool()
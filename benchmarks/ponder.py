@@ -0,0 +1,66 @@
+# Measures how long AIPlayer takes to answer with and without a Ponderer, against a scripted opponent that
+# "thinks" for a fixed time before each check or call, as a human at the console would.
+# Run from the repository root: python -m benchmarks.ponder [--hands N] [--think S]
+import argparse
+import time
+
+from misc.engine import Table
+from misc.ponder import Ponderer
+from misc.player import AIPlayer, Player
+
+STACK = 1000
+
+
+class SlowCaller(Player):
+    def __init__(self, name, chips, think):
+        super().__init__(name, chips)
+        self.think = think
+
+    def choose_action(self, state, opponent, type):
+        time.sleep(self.think)
+        return "check" if type == 1 else "call"
+
+    def choose_raise(self, state, opponent):
+        raise AssertionError("SlowCaller never raises")
+
+
+class TimedBot(AIPlayer):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.response_times = []
+
+    def choose_action(self, state, opponent, type):
+        start = time.perf_counter()
+        action = super().choose_action(state, opponent, type)
+        self.response_times.append(time.perf_counter() - start)
+        return action
+
+
+def run(hands, think, trials, ponder, seed):
+    bot = TimedBot("Bot", STACK, num_simulations=trials, seed=seed)
+    opponent = SlowCaller("Caller", STACK, think)
+    table = Table(opponent, bot, STACK / 100, STACK / 50, seed=seed)
+    if ponder:
+        ponderer = Ponderer(bot)
+        table.add_listener(ponderer)
+    for _ in range(hands):
+        bot.chips = opponent.chips = STACK
+        table.play_hand()
+    if ponder:
+        ponderer.stop()
+    times = sorted(bot.response_times)
+    return times[len(times) // 2], times[int(len(times) * 0.9)], times[-1], len(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hands", type=int, default=30)
+    parser.add_argument("--think", type=float, default=1.0, help="opponent's seconds per action")
+    parser.add_argument("--trials", type=int, default=100000, help="equity trials per bot decision")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for ponder in (False, True):
+        p50, p90, worst, decisions = run(args.hands, args.think, args.trials, ponder, args.seed)
+        print(f"{'pondering' if ponder else 'no pondering'}: {decisions} decisions, response p50 {p50 * 1000:.1f} ms, "
+              f"p90 {p90 * 1000:.1f} ms, max {worst * 1000:.1f} ms")
@@ -0,0 +1,53 @@
+# Measures the opponent-range code: alias-table draws per second, the cost of narrowing a range by one action,
+# and range-vs-hand equity by weighted sampling against exact weighted enumeration on the flop, turn and river.
+# Run from the repository root: python -m benchmarks.ranges [--trials N]
+import argparse
+import random
+import time
+
+from misc.deck import Deck
+from misc.hand_evaluator import HandEvaluator, np
+from misc.ranges import Range, exact_range_equity, range_equity
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=100000, help="sampled trials per equity")
+    parser.add_argument("--draws", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    deck = Deck(random.Random(args.seed))
+    hero, board = deck.deal(2), deck.deal(5)
+    HandEvaluator.evaluate(board)  # Build the lookup tables outside the timings
+    if np is not None:
+        HandEvaluator.evaluate_batch(np.array([board]))
+    villain_range = Range()
+    _, seconds = timed(villain_range.narrow, "raise", [], hero)
+    print(f"narrow preflop: {seconds * 1000:.2f} ms")
+    _, seconds = timed(villain_range.narrow, "call", board[:3], hero)
+    print(f"narrow on the flop: {seconds * 1000:.2f} ms")
+    _, seconds = timed(villain_range.build_alias)
+    print(f"alias table build: {seconds * 1000:.2f} ms")
+
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    for _ in range(args.draws):
+        villain_range.sample(rng, hero + board)
+    print(f"draws, one at a time: {args.draws / (time.perf_counter() - start):,.0f}/s")
+    if np is not None:
+        _, seconds = timed(villain_range.sample_batch, args.draws * 10, np.random.default_rng(args.seed), hero + board)
+        print(f"draws, batched: {args.draws * 10 / seconds:,.0f}/s")
+
+    print(f"{hero} on {board}")
+    for known in (3, 4, 5):
+        sampled, sampled_seconds = timed(range_equity, hero, board[:known], villain_range, args.trials, args.seed)
+        exact, exact_seconds = timed(exact_range_equity, hero, board[:known], villain_range)
+        print(f"  {known} board cards: sampled {sampled:.4f} in {sampled_seconds * 1000:.0f} ms, "
+              f"exact {exact:.4f} in {exact_seconds * 1000:.0f} ms")
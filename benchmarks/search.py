@@ -0,0 +1,51 @@
+# Measures misc.search: playouts and tree nodes per second on each street for a fixed number of playouts, how many
+# playouts fit in AIPlayer's time budget, and a short duplicate match of AIPlayer(search_time=...) against the
+# default bot (misc.tournament), reported in bb/100 with a 95% interval.
+# Run from the repository root: python -m benchmarks.search [--spots N] [--playouts N] [--deals N]
+import argparse
+import random
+import time
+
+from benchmarks.suite import spots
+from misc.search import SEARCH_TIME, SearchState, search
+from misc.tournament import play_block, summarize
+
+STACK = 1000
+
+
+def root(street):
+    # Preflop: small blind to act. Later streets: a pot of 60, out of position and first to act
+    if street == 0:
+        return SearchState([STACK - 10, STACK - 20], [10, 20], 30, 0, 0, 1, [False, False])
+    return SearchState([STACK - 30, STACK - 30], [0, 0], 60, street, 0, 0, [False, False])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spots", type=int, default=20)
+    parser.add_argument("--playouts", type=int, default=5000, help="playouts per search for the rates")
+    parser.add_argument("--deals", type=int, default=200, help="duplicate deals in the match")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    search(root(1), *spots(1, 3, args.seed)[0], rng, None, 1000)  # Build the evaluator tables outside the timings
+    for street, name, board_size in ((0, "preflop", 0), (1, "flop", 3), (2, "turn", 4), (3, "river", 5)):
+        cases = spots(args.spots, board_size, args.seed)
+        playouts = nodes = 0
+        start = time.perf_counter()
+        for hand, board in cases:
+            result = search(root(street), hand, board, rng, None, args.playouts)
+            playouts += result.playouts
+            nodes += result.nodes
+        seconds = time.perf_counter() - start
+        budget = [search(root(street), hand, board, rng, SEARCH_TIME).playouts for hand, board in cases]
+        print(f"{name}: {playouts / seconds:,.0f} playouts/s, {nodes / seconds:,.0f} nodes/s, "
+              f"{nodes / len(cases):,.0f} nodes per search, {sum(budget) / len(budget):,.0f} playouts "
+              f"in {SEARCH_TIME * 1000:.0f} ms")
+
+    start = time.perf_counter()
+    deals, total, squares = play_block({"search_time": 0.02}, {}, args.seed, args.deals)
+    mean, margin = summarize(deals, total, squares)
+    print(f"search (20 ms) vs default: {mean:+.1f} +/- {margin:.1f} bb/100 over {2 * deals} hands "
+          f"({time.perf_counter() - start:.0f} s)")
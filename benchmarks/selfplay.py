@@ -0,0 +1,40 @@
+# Measures headless bot-vs-bot hands per second through misc.engine.Table: random players (the engine alone), the
+# default AIPlayer, which simulates equity for every decision, and AIPlayer(strategy=True), which looks decisions up
+# in data/strategy.bin and is the configuration for fast self-play.
+# Run from the repository root: python -m benchmarks.selfplay [--hands N]
+import argparse
+import time
+
+from misc.engine import Table
+from misc.player import AIPlayer, RandomPlayer
+
+STACK = 1000
+
+
+def run(player1, player2, hands, seed):
+    table = Table(player1, player2, STACK / 100, STACK / 50, seed=seed)
+    start = time.perf_counter()
+    for _ in range(hands):
+        player1.chips = player2.chips = STACK  # Play every hand at full depth instead of until someone busts
+        table.play_hand()
+    return hands / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hands", type=int, default=20000)
+    parser.add_argument("--bot-hands", type=int, default=200)
+    parser.add_argument("--trials", type=int, default=2000, help="equity trials per bot decision")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rate = run(RandomPlayer("Random 1", STACK, seed=1), RandomPlayer("Random 2", STACK, seed=2), args.hands, args.seed)
+    print(f"engine only (random players): {rate:,.0f} hands/s")
+
+    bots = [AIPlayer(f"Bot {i}", STACK, num_simulations=args.trials, seed=i) for i in (1, 2)]
+    rate = run(bots[0], bots[1], args.bot_hands, args.seed)
+    print(f"AIPlayer vs AIPlayer, {args.trials} trials per decision: {rate:,.1f} hands/s")
+
+    bots = [AIPlayer(f"Bot {i}", STACK, seed=i, strategy=True) for i in (1, 2)]
+    rate = run(bots[0], bots[1], args.hands // 10, args.seed)
+    print(f"AIPlayer(strategy=True) vs AIPlayer(strategy=True): {rate:,.0f} hands/s")
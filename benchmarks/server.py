@@ -0,0 +1,112 @@
+# Load test for misc.server: many concurrent clients each play heads-up games against the server's bot and
+# time every wait for their turn, from sending a move (or joining) to the next "act" prompt.
+# Reports tables sustained, bot decisions/s and latency percentiles.
+# Run from the repository root: python -m benchmarks.server [--tables N] [--seconds S]
+# With --port or --unix it loads an already running server instead of starting one in-process.
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from misc.server import GameServer
+
+STACK = 1000
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def client(open_connection, name, deadline, rng, stats):
+    reader, writer = await open_connection()
+    waited_since = time.perf_counter()
+
+    def send(message):
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    send({"type": "join", "name": name, "buyin": STACK})
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                stats["errors"] += 1
+                return
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "act":
+                stats["latencies"].append(time.perf_counter() - waited_since)
+                options = message["options"]
+                if "raise" in options and rng.random() < 0.2 and message["min_raise"] <= message["chips"]:
+                    move = {"type": "action", "action": "raise", "amount": max(message["min_raise"], STACK / 50)}
+                    if move["amount"] > message["chips"]:
+                        move["amount"] = "all in"
+                else:
+                    move = {"type": "action", "action": "check" if "check" in options else "call"}
+                waited_since = time.perf_counter()
+                send(move)
+            elif kind == "action" and message["player"] != name:
+                stats["bot_actions"] += 1
+            elif kind == "hand_end":
+                stats["hands"] += 1
+                if time.perf_counter() >= deadline:
+                    send({"type": "quit"})  # The server sees a disconnect and drops the table
+                    return
+            elif kind == "game_over":
+                stats["games"] += 1
+                if time.perf_counter() >= deadline:
+                    send({"type": "quit"})
+                    return
+                waited_since = time.perf_counter()
+                send({"type": "join", "name": name, "buyin": STACK})
+            elif kind == "error":
+                stats["errors"] += 1
+    finally:
+        writer.close()
+
+
+async def run(tables, seconds, trials, host, port, unix, seed):
+    server = listener = None
+    if port is None and unix is None:
+        server = GameServer(max_tables=tables, bot_config={"num_simulations": trials})
+        listener = await server.serve(host, 0)
+        port = listener.sockets[0].getsockname()[1]
+    if unix:
+        open_connection = lambda: asyncio.open_unix_connection(unix)
+    else:
+        open_connection = lambda: asyncio.open_connection(host, port)
+
+    stats = {"latencies": [], "bot_actions": 0, "hands": 0, "games": 0, "errors": 0}
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    deadline = start + seconds
+    clients = [client(open_connection, f"Client {i}", deadline, random.Random(rng.getrandbits(32)), stats)
+               for i in range(tables)]
+    results = await asyncio.gather(*clients, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    if listener is not None:
+        listener.close()
+        await server.drain()
+        server.close()
+
+    failed = sum(isinstance(result, Exception) for result in results)
+    latencies = stats["latencies"]
+    print(f"tables sustained: {tables - failed}/{tables} for {elapsed:.1f}s "
+          f"({stats['games']} games, {stats['hands']:,} hands, {stats['errors']} errors)")
+    print(f"bot decisions: {stats['bot_actions'] / elapsed:,.1f}/s, client turns: {len(latencies) / elapsed:,.1f}/s")
+    print("turn latency: " + ", ".join(f"p{q * 100:g} {percentile(latencies, q) * 1000:.1f} ms"
+                                       for q in (0.5, 0.9, 0.99, 0.999)) + f", max {max(latencies, default=0) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0, help="clients stop after their first game past this")
+    parser.add_argument("--trials", type=int, default=2000, help="equity trials per bot decision (in-process server)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--unix")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.tables, args.seconds, args.trials, args.host, args.port, args.unix, args.seed))
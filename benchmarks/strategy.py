@@ -0,0 +1,43 @@
+# Compares AIPlayer's strategy-table mode with its simulating decisions: time per decision on each street, and
+# a short duplicate match between the two (misc.tournament), reported in bb/100 with a 95% interval.
+# Run from the repository root: python -m benchmarks.strategy [--spots N] [--deals N]
+import argparse
+import time
+
+from benchmarks.suite import spots
+from misc.player import AIPlayer
+from misc.strategy import load_table
+from misc.tournament import play_block, summarize
+
+STACK = 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spots", type=int, default=300)
+    parser.add_argument("--deals", type=int, default=500, help="duplicate deals in the match")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if load_table() is None:
+        raise SystemExit("no strategy table: build it with python -m misc.strategy")
+    for street, board_size in (("preflop", 0), ("flop", 3), ("turn", 4), ("river", 5)):
+        cases = spots(args.spots, board_size, args.seed)
+        timings = []
+        for strategy in (True, False):
+            bot = AIPlayer("Bench", STACK, num_simulations=2000, seed=args.seed, exact_threshold=0, strategy=strategy)
+            decide = bot.table_decision if strategy else bot.make_decision
+            bot.hand = cases[0][0]
+            decide(cases[0][1], 60, 20, 3)  # Build tables and caches outside the timing
+            start = time.perf_counter()
+            for hand, board in cases:
+                bot.hand = hand
+                decide(board, 60, 20, 3)
+            timings.append((time.perf_counter() - start) / len(cases) * 1e6)
+        print(f"{street}: table {timings[0]:,.0f} us, simulation {timings[1]:,.0f} us per decision")
+
+    start = time.perf_counter()
+    deals, total, squares = play_block({"strategy": True}, {}, args.seed, args.deals)
+    mean, margin = summarize(deals, total, squares)
+    print(f"strategy table vs simulation: {mean:+.1f} +/- {margin:.1f} bb/100 over {2 * deals} hands "
+          f"({time.perf_counter() - start:.0f} s)")
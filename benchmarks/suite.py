@@ -0,0 +1,170 @@
+# Fixed-seed benchmark suite for every layer of the bot, with JSON results and regression checks.
+#   python -m benchmarks.suite --output bench.json                          record a run
+#   python -m benchmarks.suite --compare bench.json --tolerance 0.15        fail if any metric got >15% slower
+#   python -m benchmarks.suite --only equity                                run matching workloads only
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from misc.deck import Deck
+from misc.engine import Table
+from misc.equity import simulate_equity
+from misc.hand_evaluator import HandEvaluator, np
+from misc.player import AIPlayer, RandomPlayer
+
+SEED = 1234
+STACK = 1000
+
+
+def deals(count, num_cards, seed=SEED):
+    rng = random.Random(seed)
+    result = []
+    for _ in range(count):
+        deck = Deck(rng)
+        result.append(deck.deal(num_cards))
+    return result
+
+
+def spots(count, board_size, seed=SEED):
+    return [(cards[:2], cards[2:]) for cards in deals(count, 2 + board_size, seed)]
+
+
+def time_each(function, inputs, repeat=1):
+    # Latency of every call in nanoseconds
+    latencies = []
+    for _ in range(repeat):
+        for args in inputs:
+            start = time.perf_counter_ns()
+            function(*args)
+            latencies.append(time.perf_counter_ns() - start)
+    return latencies
+
+
+def evaluator_workload(num_cards):
+    hands = [(hand,) for hand in deals(20000, num_cards)]
+    return lambda: time_each(HandEvaluator.evaluate, hands)
+
+
+def equity_workload(board_size, trials, exact):
+    cases = spots(20 if exact else 30, board_size)
+    threshold = None if exact else 0
+    def run():
+        kwargs = {"seed": SEED} if exact else {"seed": SEED, "exact_threshold": threshold}
+        return time_each(lambda hand, board: simulate_equity(hand, board, trials, **kwargs), cases)
+    return run, trials
+
+
+def bot_workload(method):
+    cases = spots(300, 3)
+    def run():
+        bot = AIPlayer("Bench", STACK, num_simulations=2000, seed=SEED, exact_threshold=0)  # Fresh equity cache every run
+        if method == "make_decision":
+            def call(hand, board):
+                bot.hand = hand
+                return bot.make_decision(board, 60, 20, 3)
+        elif method == "calc_outs":
+            call = bot.calc_outs
+        else:
+            call = lambda hand, board: bot.board_texture(board)
+        return time_each(call, cases)
+    return run
+
+
+def selfplay_workload(bots):
+    def run():
+        if bots:
+            player1 = AIPlayer("Bot 1", STACK, num_simulations=500, exact_threshold=0, seed=1)
+            player2 = AIPlayer("Bot 2", STACK, num_simulations=500, exact_threshold=0, seed=2)
+            hands = 100
+        else:
+            player1, player2 = RandomPlayer("Random 1", STACK, seed=1), RandomPlayer("Random 2", STACK, seed=2)
+            hands = 5000
+        table = Table(player1, player2, STACK / 100, STACK / 50, seed=SEED)
+        def hand():
+            player1.chips = player2.chips = STACK
+            table.play_hand()
+        return time_each(hand, [()] * hands)
+    return run
+
+
+def workloads():
+    # name -> (function returning per-operation latencies, units of work per operation)
+    result = {}
+    for num_cards in (5, 6, 7):
+        result[f"evaluate_{num_cards}_cards"] = (evaluator_workload(num_cards), 1)
+    result["deck_deal"] = (lambda: time_each(lambda: Deck().deal(9), [()] * 20000), 1)
+    for street, board_size in (("preflop", 0), ("flop", 3), ("turn", 4), ("river", 5)):
+        result[f"equity_trials_{street}"] = equity_workload(board_size, 10000, exact=False)
+    result["equity_exact_turn"] = equity_workload(4, 1, exact=True)
+    result["equity_exact_river"] = equity_workload(5, 1, exact=True)
+    for method in ("calc_outs", "board_texture", "make_decision"):
+        result[method] = (bot_workload(method), 1)
+    result["selfplay_random_hands"] = (selfplay_workload(False), 1)
+    result["selfplay_bot_hands"] = (selfplay_workload(True), 1)
+    return result
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(run, units):
+    run()  # Warm up: build lookup tables, fill caches that every run would have
+    latencies = sorted(run())
+    total = sum(latencies) / 1e9
+    return {
+        "ops_per_sec": len(latencies) * units / total,
+        "p50_us": percentile(latencies, 0.50) / 1e3,
+        "p90_us": percentile(latencies, 0.90) / 1e3,
+        "p99_us": percentile(latencies, 0.99) / 1e3,
+        "ops": len(latencies),
+    }
+
+
+def compare(results, baseline, tolerance):
+    # Names of metrics whose throughput fell by more than tolerance
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["ops_per_sec"], metrics["ops_per_sec"]
+        change = after / before - 1
+        status = "REGRESSION" if change < -tolerance else "ok"
+        print(f"{name:>24}: {before:>14,.1f} -> {after:>14,.1f} ops/s ({change:+.1%}) {status}")
+        if change < -tolerance:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed fractional slowdown per metric")
+    parser.add_argument("--only", help="run only workloads whose name contains this text")
+    args = parser.parse_args()
+
+    results = {}
+    for name, (run, units) in workloads().items():
+        if args.only and args.only not in name:
+            continue
+        results[name] = measure(run, units)
+        metrics = results[name]
+        print(f"{name:>24}: {metrics['ops_per_sec']:>14,.1f} ops/s  p50 {metrics['p50_us']:>10,.1f} us  "
+              f"p90 {metrics['p90_us']:>10,.1f} us  p99 {metrics['p99_us']:>10,.1f} us")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(), "numpy": np.__version__ if np is not None else None,
+                       "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} metric(s) regressed beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
@@ -0,0 +1,51 @@
+# Compares the error each sampling strategy reaches for a given number of trials, against exact flop equity.
+# Run from the repository root: python -m benchmarks.variance [--spots N] [--repeats N]
+import argparse
+import random
+
+from misc.deck import Deck
+from misc.equity import SAMPLING, counts, exact_counts, np, sample_deals, deal_counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spots", type=int, default=5, help="random flop spots, each solved exactly first")
+    parser.add_argument("--repeats", type=int, default=30, help="independent estimates per spot and strategy")
+    parser.add_argument("--trials", type=int, nargs="+", default=[2000, 20000])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if np is None:
+        raise SystemExit("The sampling strategies need NumPy")
+    rng = random.Random(args.seed)
+
+    spots = []
+    for _ in range(args.spots):
+        deck = Deck(rng)
+        hand, board = deck.deal(2), deck.deal(3)
+        wins, ties, total = exact_counts(hand, board)
+        spots.append((hand, board, (wins + 0.5 * ties) / total))
+
+    for trials in args.trials:
+        baseline = None
+        for sampling in SAMPLING:
+            squared = 0.0
+            for hand, board, exact in spots:
+                for repeat in range(args.repeats):
+                    wins, ties = counts(hand, board, trials, seed=[args.seed, repeat], sampling=sampling)
+                    squared += ((wins + 0.5 * ties) / trials - exact) ** 2
+            rmse = (squared / (len(spots) * args.repeats)) ** 0.5
+            baseline = baseline or rmse
+            # Error shrinks with the square root of the trials, so the trial saving is the squared error ratio
+            print(f"{trials:>7} trials, {sampling:>10}: RMSE {rmse:.5f}, {(baseline / rmse) ** 2:5.1f}x fewer trials than uniform")
+
+    # Common random numbers: the difference between two hands is far less noisy when both see the same deals
+    hand, board, _ = spots[0]
+    other = Deck(rng, hand + board).deal(2)
+    independent, common = [], []
+    for repeat in range(args.repeats):
+        generator = np.random.default_rng([args.seed, repeat])
+        first, second = counts(hand, board, 2000, [args.seed, repeat, 0]), counts(other, board, 2000, [args.seed, repeat, 1])
+        independent.append((first[0] + 0.5 * first[1] - second[0] - 0.5 * second[1]) / 2000)
+        villain, boards = sample_deals(hand + other + board, board, 2000, generator)
+        first, second = deal_counts(hand, villain, boards), deal_counts(other, villain, boards)
+        common.append((first[0] + 0.5 * first[1] - second[0] - 0.5 * second[1]) / 2000)
+    print(f"equity difference of two hands, std over repeats: independent {np.std(independent):.5f}, common deals {np.std(common):.5f}")
@@ -0,0 +1,225 @@
+# Bulk analysis of recorded spots: the showdown strength, the equity against one random hand and the outs of many
+# (hole cards, board) queries, for offline work where calling best_hand or simulate_hand once per spot spends most
+# of its time in the interpreter. Spots are taken in chunks from any iterable (lists, NumPy arrays via
+# array_spots, a text file via read_spots or a hand-history log via history_spots), each chunk is scored with
+# array operations in a worker process, and results come back in input order with at most a few chunks in flight,
+# so memory stays flat however long the input is.
+#
+#   python -m misc.batch spots.txt --output results.csv
+#   python -m misc.batch hands.log --history --workers 8
+#
+# A spot file has one spot per line, hole cards then the board in hand-history notation: "AhKd Qs7c2d", or just
+# "AhKd" preflop. Blank lines and lines starting with # are skipped.
+import argparse
+import csv
+import os
+import sys
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from misc.deck import CARDS
+from misc.equity import BATCH_SIZE, distinct_indices, make_rng, serial_counts
+from misc.hand_evaluator import HandEvaluator, np
+from misc.history import HandHistoryReader, card_text
+from misc.outs import find_outs
+from misc.preflop import preflop_equity
+
+CHUNK_SIZE = 1000  # Spots per task
+TRIALS = 2000  # Equity trials per spot
+IN_FLIGHT = 2  # Chunks queued per worker
+CARD_CODES = {card_text(card): card for card in CARDS}
+CARD_CODES.update({code.replace("T", "10"): card for code, card in CARD_CODES.items() if code[0] == "T"})
+FIELDS = ("hand", "board", "strength", "hand_type", "equity", "outs", "next_card", "by_river")
+
+# strength and hand_type are None before the flop; outs is the number of out cards, next_card and by_river the
+# chances of improving as in misc.outs (all None when outs were not asked for)
+SpotResult = namedtuple("SpotResult", FIELDS)
+
+
+def parse_cards(text):
+    # "AhKd" or "Ah Kd" -> [A♥, K♦]
+    text = text.replace(" ", "")
+    cards = []
+    i = 0
+    while i < len(text):
+        size = 3 if text[i] == "1" else 2
+        card = CARD_CODES.get(text[i:i + size][:-1].upper() + text[i:i + size][-1:].lower())
+        if card is None:
+            raise ValueError(f"bad card {text[i:i + size]!r} in {text!r}")
+        cards.append(card)
+        i += size
+    return cards
+
+
+def check_spot(hand, board):
+    if len(hand) != 2 or len(board) not in (0, 3, 4, 5) or len(set(hand + board)) != len(hand) + len(board):
+        raise ValueError(f"not a spot: {hand} on {board}")
+    return hand, board
+
+
+def read_spots(path):
+    # Spots from a text file, one line at a time
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            hand, _, board = line.partition(" ")
+            try:
+                yield check_spot(parse_cards(hand), parse_cards(board))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}") from None
+
+
+def history_spots(path):
+    # Every spot of a hand-history log: each player's hole cards on every street the hand reached
+    with HandHistoryReader(path) as reader:
+        for record in reader:
+            for size in (0, 3, 4, 5):
+                if size > len(record.board):
+                    break
+                for hole in record.hole_cards:
+                    if hole:
+                        yield hole, record.board[:size]
+
+
+def array_spots(hands, boards):
+    # Spots from an (N, 2) array of hole cards and an (N, 5) array of boards, padded with -1 past each board's end
+    for hand, board in zip(np.asarray(hands).tolist(), np.asarray(boards).tolist()):
+        yield [CARDS[card] for card in hand], [CARDS[card] for card in board if card >= 0]
+
+
+def chunk_seed(seed, index):
+    # Chunk index's own stream, so results depend on the seed and chunk size but not on the number of workers
+    if np is not None:
+        return np.random.SeedSequence(seed.entropy, spawn_key=(index,))
+    return None if seed is None else f"{seed}-{index}"
+
+
+def equities(hands, board_size, boards, trials, rng):
+    # Equity of each hand (an (M, 2) array, boards (M, board_size)) against a random hand, trials deals each, scored
+    # for as many spots at once as fit in one BATCH_SIZE batch. Deals index each spot's own live cards, so only
+    # deals that repeat a card are redrawn
+    rows = np.arange(len(hands))[:, None]
+    live = np.ones((len(hands), 52), dtype=bool)
+    live[rows, hands] = False
+    live[rows, boards] = False
+    live = np.nonzero(live)[1].reshape(len(hands), -1)
+    result = np.empty(len(hands))
+    step = max(1, BATCH_SIZE // trials)
+    for start in range(0, len(hands), step):
+        spot = np.repeat(np.arange(start, min(start + step, len(hands))), trials)[:, None]
+        drawn = live[spot, distinct_indices(live.shape[1], len(spot), 7 - board_size, rng)]
+        board = np.hstack([boards[spot[:, 0]], drawn[:, 2:]])
+        ours = HandEvaluator.evaluate_batch(np.hstack([hands[spot[:, 0]], board])).reshape(-1, trials)
+        theirs = HandEvaluator.evaluate_batch(np.hstack([drawn[:, :2], board])).reshape(-1, trials)
+        result[start:start + step] = ((ours > theirs).sum(axis=1) + 0.5 * (ours == theirs).sum(axis=1)) / trials
+    return result
+
+
+def analyze_chunk(spots, trials=TRIALS, seed=None, outs=True):
+    # SpotResults for a list of (hand, board) spots. Spots are grouped by board size, and each group's strengths
+    # and equities come from a few evaluate_batch calls over the whole group
+    rng = make_rng(seed)
+    strengths = [None] * len(spots)
+    equity = [None] * len(spots)
+    groups = {}
+    for index, (hand, board) in enumerate(spots):
+        groups.setdefault(len(board), []).append(index)
+    for board_size, indices in groups.items():
+        if board_size == 0:
+            for index in indices:
+                equity[index] = preflop_equity(spots[index][0])
+            indices = [index for index in indices if equity[index] is None]  # Sampled when the table is missing
+            if not indices:
+                continue
+        if np is None:
+            for index in indices:
+                hand, board = spots[index]
+                if board_size:
+                    strengths[index] = HandEvaluator.evaluate(hand + board)
+                wins, ties = serial_counts(hand, board, trials, rng)
+                equity[index] = (wins + ties / 2) / trials
+            continue
+        hands = np.array([spots[index][0] for index in indices], dtype=np.int64)
+        boards = np.array([spots[index][1] for index in indices], dtype=np.int64).reshape(len(indices), board_size)
+        if board_size:
+            for index, strength in zip(indices, HandEvaluator.evaluate_batch(np.hstack([hands, boards])).tolist()):
+                strengths[index] = strength
+        for index, value in zip(indices, equities(hands, board_size, boards, trials, rng).tolist()):
+            equity[index] = value
+
+    results = []
+    for (hand, board), strength, value in zip(spots, strengths, equity):
+        hand_type = HandEvaluator.hand_type(strength) if strength is not None else None
+        if outs and 3 <= len(board) < 5:
+            found = find_outs(hand, board)
+            counted = (len(found.cards), found.next_card, found.by_river)
+        elif outs:
+            counted = (0, 0.0, 0.0)
+        else:
+            counted = (None, None, None)
+        results.append(SpotResult(hand, board, strength, hand_type, value, *counted))
+    return results
+
+
+def analyze(spots, trials=TRIALS, seed=None, workers=None, chunk_size=CHUNK_SIZE, outs=True):
+    # SpotResults for an iterable of (hand, board) spots, in order and as they are ready. The input is read a
+    # chunk at a time and only workers * IN_FLIGHT chunks are queued, so neither side is held in memory
+    workers = workers or os.cpu_count() or 1
+    root = np.random.SeedSequence(seed) if np is not None else seed
+    spots = iter(spots)
+    chunks = iter(lambda: [check_spot(list(hand), list(board)) for hand, board in islice(spots, chunk_size)], [])
+    if workers == 1:
+        for index, chunk in enumerate(chunks):
+            yield from analyze_chunk(chunk, trials, chunk_seed(root, index), outs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for index, chunk in enumerate(chunks):
+            pending.append(pool.submit(analyze_chunk, chunk, trials, chunk_seed(root, index), outs))
+            if len(pending) >= workers * IN_FLIGHT:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def result_row(result):
+    return ["".join(card_text(card) for card in result.hand), "".join(card_text(card) for card in result.board),
+            "" if result.strength is None else result.strength, result.hand_type or "",
+            f"{result.equity:.4f}", "" if result.outs is None else result.outs,
+            "" if result.next_card is None else f"{result.next_card:.4f}",
+            "" if result.by_river is None else f"{result.by_river:.4f}"]
+
+
+def write_csv(results, out):
+    # Streams results to a file object as CSV, one row per spot; returns the number of rows
+    writer = csv.writer(out)
+    writer.writerow(FIELDS)
+    count = 0
+    for result in results:
+        writer.writerow(result_row(result))
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="spot file, or hand-history log with --history")
+    parser.add_argument("--history", action="store_true", help="read the spots of a misc.history log")
+    parser.add_argument("--output", default="-", help="CSV file to write ('-' for stdout)")
+    parser.add_argument("--trials", type=int, default=TRIALS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-outs", action="store_true", help="skip counting outs")
+    args = parser.parse_args()
+
+    spots = history_spots(args.path) if args.history else read_spots(args.path)
+    results = analyze(spots, args.trials, args.seed, args.workers, args.chunk_size, not args.no_outs)
+    if args.output == "-":
+        count = write_csv(results, sys.stdout)
+    else:
+        with open(args.output, "w", newline="") as out:
+            count = write_csv(results, out)
+    print(f"{count:,} spots analyzed", file=sys.stderr)
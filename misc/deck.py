@@ -1,23 +1,152 @@
 import random
 
-class Card:
-    def __init__(self, suit, rank):
-        self.suit = suit
-        self.rank = rank
+SUITS = ['♣', '♦', '♥', '♠']
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+class Card(int):
+    # A card is an int from 0 to 51 (rank index * 4 + suit index), so equal cards compare and hash equal
+    # and can index the per-card tables below directly. Only the 52 instances in CARDS are ever created.
+    __slots__ = ()
+
+    def __new__(cls, suit, rank):
+        return CARDS[RANKS.index(rank) * 4 + SUITS.index(suit)]
+
+    def __getnewargs__(self):
+        return (self.suit, self.rank)
+
+    @property
+    def suit(self):
+        return SUITS[self & 3]
+
+    @property
+    def rank(self):
+        return RANKS[self >> 2]
 
     def __repr__(self):
-        return f"{self.rank}{self.suit}"
+        return f"{RANKS[self >> 2]}{SUITS[self & 3]}"
+
+    __str__ = __repr__
+
+    def __format__(self, format_spec):
+        return format(repr(self), format_spec)
+
+CARDS = tuple(int.__new__(Card, i) for i in range(52))
+
+# Per-card lookup tables, indexed by the card itself
+RANK_OF = tuple(i >> 2 for i in range(52))  # 0 (deuce) to 12 (ace)
+SUIT_OF = tuple(i & 3 for i in range(52))
+RANK_VALUE = tuple((i >> 2) + 2 for i in range(52))  # 2 to 14, as returned by HandEvaluator.card_rank
+RANK_BIT = tuple(1 << (i >> 2) for i in range(52))
+PRIME_OF = tuple(PRIMES[i >> 2] for i in range(52))
+
+class Dealer:
+    # Deals cards without replacement by partial Fisher-Yates: each card dealt is one random swap to the front of
+    # a preallocated buffer of the live cards, so dealing 7 cards costs 7 random numbers rather than a shuffle of
+    # the deck. Dead cards are a 52-bit mask. The buffer stays a permutation of the live cards, so a trial loop can
+    # deal into the same lists over and over without putting anything back.
+    __slots__ = ("rng", "random", "buffer", "size", "dealt", "dead")
+
+    def __init__(self, dead_cards=(), rng=None):
+        self.rng = rng or random  # Pass a random.Random to make the deals reproducible
+        self.random = self.rng.random
+        self.buffer = list(CARDS)
+        self.reset(dead_cards)
+
+    def reset(self, dead_cards=()):
+        # Everything but dead_cards back in the deck
+        dead = 0
+        for card in dead_cards:
+            dead |= 1 << card
+        buffer = self.buffer
+        if not dead:
+            buffer[:] = CARDS
+            size = 52
+        else:
+            size = 0
+            for card in CARDS:
+                if not dead >> card & 1:
+                    buffer[size] = card
+                    size += 1
+        self.dead = dead
+        self.size = size
+        self.dealt = 0
+
+    def remaining(self):
+        return self.buffer[self.dealt:self.size]
+
+    def deal(self, num_cards):
+        # The next num_cards cards, taken out of the deck
+        cards = [0] * num_cards
+        self.dealt = self.fill(cards, self.dealt)
+        return cards
+
+    def deal_into(self, cards, tail=None, exclude=0, start=0):
+        # Fills cards[start:] with distinct cards still in the deck, without taking them out, so every call is a
+        # fresh deal into the same list. tail, if given, gets a copy of the last len(tail) cards, e.g. the runout
+        # on its own as well as after the opponent's hand. Cards whose bit is set in exclude are redrawn, for
+        # cards dead in this deal only.
+        self.fill(cards, self.dealt, exclude, start)
+        if tail is not None:
+            i, offset = 0, len(cards) - len(tail)
+            while i < len(tail):
+                tail[i] = cards[offset + i]
+                i += 1
+
+    def fill(self, cards, position, exclude=0, start=0):
+        buffer = self.buffer
+        random = self.random
+        span = self.size - position
+        i, end = start, len(cards)
+        if end - i > span:
+            raise ValueError(f"cannot deal {end - i} cards, {span} left in the deck")
+        while i < end:  # Rather than a for loop over range(), which would allocate
+            j = position + int(random() * span)
+            card = buffer[j]
+            attempts = 0
+            while exclude >> card & 1:
+                attempts += 1
+                if attempts % 1000 == 0 and all(exclude >> other & 1 for other in buffer[position:self.size]):
+                    raise ValueError("every card left in the deck is excluded")
+                j = position + int(random() * span)
+                card = buffer[j]
+            buffer[j] = buffer[position]
+            buffer[position] = card
+            cards[i] = card
+            i += 1
+            position += 1
+            span -= 1
+        return position
 
 class Deck:
-    suits = ['♣', '♦', '♥', '♠']
-    ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+    suits = SUITS
+    ranks = RANKS
+
+    def __init__(self, rng=None, dead_cards=()):
+        self.rng = rng or random  # Pass a random.Random to make the deal reproducible
+        self.dealer = Dealer(dead_cards, self.rng)
+        self.stacked = None  # Cards assigned to deck.cards, dealt in order
+
+    @property
+    def cards(self):
+        # Cards not dealt yet
+        if self.stacked is not None:
+            return list(self.stacked)
+        return self.dealer.remaining()
 
-    def __init__(self):
-        self.cards = [Card(suit, rank) for suit in self.suits for rank in self.ranks]
-        self.shuffle()
+    @cards.setter
+    def cards(self, cards):
+        # Stacks the deck: from here on cards are dealt from the end of this list, in order
+        self.stacked = list(cards)
 
     def shuffle(self):
-        random.shuffle(self.cards)
+        # Only a stacked deck has an order to shuffle; otherwise cards are drawn at random as they are dealt
+        if self.stacked is not None:
+            self.rng.shuffle(self.stacked)
 
     def deal(self, num_cards):
-        return [self.cards.pop() for _ in range(num_cards)]
+        if self.stacked is not None:
+            if num_cards > len(self.stacked):
+                raise ValueError(f"cannot deal {num_cards} cards, {len(self.stacked)} left in the deck")
+            return [self.stacked.pop() for _ in range(num_cards)]
+        return self.dealer.deal(num_cards)
@@ -0,0 +1,333 @@
+# Headless game engine: the rules of the console game with no input, printing or sleeping. Table plays heads-up
+# exactly as the console game does; RingTable seats 2 to 9 players, with side pots for short all ins.
+# Players act through Player.choose_action / choose_raise, and a listener can follow every step of a hand.
+import random
+from misc.deck import Deck
+from misc.hand_evaluator import BoardState, HandEvaluator
+from misc.player import ACTIONS
+
+STREETS = ["preflop", "flop", "turn", "river"]
+MAX_SEATS = 9
+
+
+class HandState:
+    def __init__(self, hand_num, player1, player2, dealer, small_blind, big_blind, deck):
+        self.hand_num = hand_num
+        self.player1 = player1
+        self.player2 = player2
+        self.players = (player1, player2)
+        self.dealer = dealer
+        # The dealer's opponent posts the small blind and acts first on every street
+        self.first_actor = player2 if dealer is player1 else player1
+        self.second_actor = dealer
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.deck = deck
+        self.pot = 0
+        self.community_cards = []
+        self.street = 0  # Index into STREETS
+        self.actions = []  # (street, player, action, chips added)
+        self.winner = None  # Player who took the pot, None for a split pot
+
+
+class Table:
+    def __init__(self, player1, player2, small_blind, big_blind, seed=None, listener=None):
+        self.player1 = player1
+        self.player2 = player2
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.dealer = player1
+        self.hand_num = 0
+        self.rng = random.Random(seed)
+        self.listeners = [listener] if listener is not None else []  # Each called as listener(event, state, **details)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, state, **details):
+        for listener in self.listeners:
+            listener(event, state, **details)
+
+    def game_over(self):
+        return self.player1.chips <= 0 or self.player2.chips <= 0
+
+    def play_hand(self, deck=None):
+        # Pass a deck to replay a known deal, e.g. with the seats swapped
+        self.hand_num += 1
+        deck = deck or Deck(self.rng)
+        state = HandState(self.hand_num, self.player1, self.player2, self.dealer, self.small_blind, self.big_blind, deck)
+        for player in (self.player1, self.player2):
+            player.folded = False
+            player.current_bet = 0
+        self.player1.hand = state.deck.deal(2)
+        self.player2.hand = state.deck.deal(2)
+        first, second = state.first_actor, state.second_actor
+
+        self.emit("hand_start", state)
+        first.chips -= self.small_blind
+        second.chips -= self.big_blind
+        state.pot += self.small_blind + self.big_blind
+        self.emit("blinds", state)
+
+        self.betting_round(state, first, self.small_blind, second, self.big_blind, True)
+        for street, num_cards in ((1, 3), (2, 1), (3, 1)):
+            state.street = street
+            state.community_cards.extend(state.deck.deal(num_cards))
+            self.emit("deal", state)
+            self.betting_round(state, first, 0, second, 0, False)
+
+        self.settle(state)
+        self.dealer = self.player2 if self.dealer is self.player1 else self.player1
+        return state
+
+    def betting_round(self, state, player1, player1_bet, player2, player2_bet, blinds):
+        if player1.folded or player2.folded or player1.chips <= 0 or player2.chips <= 0:
+            return
+        seats = (player1, player2)
+        acted = [False, False]
+        player1.current_bet = player1_bet
+        player2.current_bet = player2_bet
+        while True:
+            for i in (0, 1):
+                if acted[i]:
+                    continue
+                player, opponent = seats[i], seats[1 - i]
+                if player.current_bet == opponent.current_bet:
+                    type = 1
+                elif opponent.current_bet >= player.chips:
+                    type = 2
+                else:
+                    type = 3
+                action = player.choose_action(state, opponent, type)
+                if action not in ACTIONS[type]:
+                    raise ValueError(f"{player.name} chose {action!r}, expected one of {ACTIONS[type]}")
+
+                amount = 0
+                if action == "fold":
+                    player.fold()
+                elif action == "check":
+                    player.check()
+                elif action == "call":
+                    amount = player.call(player.current_bet, opponent.current_bet)
+                    if not blinds:
+                        acted[1 - i] = True
+                else:
+                    amount = player.choose_raise(state, opponent)
+                    acted[1 - i] = False
+                acted[i] = True
+                state.pot += amount
+                state.actions.append((state.street, player, action, amount))
+                self.emit("action", state, player=player, action=action, amount=amount)
+                if action == "fold":
+                    return
+
+            # End the betting round if both players have acted and bets are equal
+            if acted[0] and acted[1] and player1.current_bet == player2.current_bet:
+                return
+
+    def settle(self, state):
+        player1, player2 = self.player1, self.player2
+        if player1.folded:
+            state.winner = player2
+        elif player2.folded:
+            state.winner = player1
+        else:
+            strength1 = HandEvaluator.evaluate(player1.hand + state.community_cards)
+            strength2 = HandEvaluator.evaluate(player2.hand + state.community_cards)
+            if strength1 != strength2:
+                state.winner = player1 if strength1 > strength2 else player2
+        self.emit("result", state)  # Winner known, pot not yet paid out
+
+        if state.winner is not None:
+            state.winner.chips += state.pot
+        else:
+            player1.chips += int(state.pot / 2)
+            player2.chips += int(state.pot / 2)
+        self.emit("hand_end", state)
+
+
+def showdown_strengths(hands, community_cards):
+    # Strength of each hand on the shared board, which is scored once for all of them. Nine hands are too few
+    # for a NumPy batch to pay off; multi-way equity batches its showdowns across trials instead.
+    board = BoardState(community_cards)
+    return [board.evaluate(hand) for hand in hands]
+
+
+def side_pots(contributions, live):
+    # [(amount, eligible players)] from each player's chips in the pot, main pot first. A player who went all in
+    # for less only contests the chips matched by that amount; folded players' chips stay in the pots they reached.
+    pots = []
+    previous = 0
+    for level in sorted({contributions[player] for player in live}):
+        amount = sum(min(chips, level) - min(chips, previous) for chips in contributions.values())
+        pots.append((amount, [player for player in live if contributions[player] >= level]))
+        previous = level
+    extra = sum(chips - previous for chips in contributions.values() if chips > previous)
+    if extra:  # Folded chips above every live player's total
+        pots[-1] = (pots[-1][0] + extra, pots[-1][1])
+    return pots
+
+
+class RingHandState:
+    def __init__(self, hand_num, players, dealer, small_blind, big_blind, deck):
+        self.hand_num = hand_num
+        self.players = players  # Seats dealt into this hand, in seat order
+        self.dealer = dealer
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.deck = deck
+        self.pot = 0
+        self.contributions = {player: 0 for player in players}  # Chips each player has put in this hand
+        self.community_cards = []
+        self.street = 0  # Index into STREETS
+        self.actions = []  # (street, player, action, chips added)
+        self.pots = []  # (amount, eligible players, winners), main pot first, filled in at the end
+        self.winners = []  # Players who took a share of any pot
+
+
+class RingTable:
+    # 2 to MAX_SEATS players. The seat after the dealer posts the small blind and the next the big blind; preflop
+    # the seat after the big blind acts first, and after the flop the first seat after the dealer. Players with no
+    # chips left sit out. A player asked to act is handed the player holding the largest bet as the opponent.
+    # chip is the smallest amount the table splits a pot into: AIPlayer bets in half chips, so by default pots split
+    # in halves, and a table of whole-number blinds, stacks and bets can pass chip=1 to keep every stack an int.
+    def __init__(self, players, small_blind, big_blind, seed=None, listener=None, chip=0.5):
+        if not 2 <= len(players) <= MAX_SEATS:
+            raise ValueError(f"a table seats 2 to {MAX_SEATS} players, got {len(players)}")
+        if chip <= 0:
+            raise ValueError(f"chip must be positive, got {chip}")
+        self.players = list(players)
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.chip = chip
+        self.dealer = self.players[0]
+        self.hand_num = 0
+        self.rng = random.Random(seed)
+        self.listeners = [listener] if listener is not None else []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, event, state, **details):
+        for listener in self.listeners:
+            listener(event, state, **details)
+
+    def seated(self):
+        return [player for player in self.players if player.chips > 0]
+
+    def game_over(self):
+        return len(self.seated()) < 2
+
+    def play_hand(self, deck=None):
+        self.hand_num += 1
+        deck = deck or Deck(self.rng)
+        seats = self.seated()
+        # Seat order starting just after the dealer; a busted dealer passes the button to the next seat
+        start = self.players.index(self.dealer)
+        order = sorted(seats, key=lambda player: (self.players.index(player) - start - 1) % len(self.players))
+        state = RingHandState(self.hand_num, order, self.dealer, self.small_blind, self.big_blind, deck)
+        for player in order:
+            player.folded = False
+            player.current_bet = 0
+        for player in order:
+            player.hand = deck.deal(2)
+
+        self.emit("hand_start", state)
+        small, big = order[0], order[1 % len(order)]
+        for player, blind in ((small, self.small_blind), (big, self.big_blind)):
+            self.put(state, player, min(blind, player.chips))
+        self.emit("blinds", state)
+
+        preflop = order[2:] + order[:2] if len(order) > 2 else order
+        self.betting_round(state, preflop)
+        for street, num_cards in ((1, 3), (2, 1), (3, 1)):
+            state.street = street
+            state.community_cards.extend(deck.deal(num_cards))
+            self.emit("deal", state)
+            for player in order:
+                player.current_bet = 0
+            self.betting_round(state, order)
+
+        self.settle(state)
+        self.dealer = self.next_dealer()
+        return state
+
+    def next_dealer(self):
+        start = self.players.index(self.dealer)
+        for step in range(1, len(self.players) + 1):
+            player = self.players[(start + step) % len(self.players)]
+            if player.chips > 0:
+                return player
+        return self.dealer
+
+    def put(self, state, player, amount):
+        player.bet(amount)
+        state.pot += amount
+        state.contributions[player] += amount
+
+    def betting_round(self, state, order):
+        live = [player for player in order if not player.folded]
+        if len(live) < 2:
+            return
+        to_act = [player for player in live if player.chips > 0]
+        high = max(player.current_bet for player in live)
+        if len(to_act) < 2 and all(player.current_bet >= high for player in to_act):
+            return  # Everyone but at most one player is all in, and that player has nothing to call
+        while to_act:
+            player = to_act.pop(0)
+            if player.folded or player.chips <= 0:
+                continue
+            live = [p for p in order if not p.folded]
+            if len(live) < 2:
+                return
+            high = max(p.current_bet for p in live)
+            opponent = max((p for p in live if p is not player), key=lambda p: p.current_bet)
+            if player.current_bet == high:
+                type = 1
+            elif high - player.current_bet >= player.chips:
+                type = 2
+            else:
+                type = 3
+            action = player.choose_action(state, opponent, type)
+            if action not in ACTIONS[type]:
+                raise ValueError(f"{player.name} chose {action!r}, expected one of {ACTIONS[type]}")
+
+            amount = 0
+            if action == "fold":
+                player.fold()
+            elif action == "call":
+                amount = min(high - player.current_bet, player.chips)
+                self.put(state, player, amount)
+            elif action == "raise":
+                amount = player.choose_raise(state, opponent)  # The player has bet it already
+                state.pot += amount
+                state.contributions[player] += amount
+                if player.current_bet > high:  # A raise reopens the betting for everyone else still in with chips
+                    seat = order.index(player)
+                    to_act = [p for p in order[seat + 1:] + order[:seat] if not p.folded and p.chips > 0]
+            state.actions.append((state.street, player, action, amount))
+            self.emit("action", state, player=player, action=action, amount=amount)
+
+    def settle(self, state):
+        live = [player for player in state.players if not player.folded]
+        if len(live) > 1:
+            strengths = dict(zip(live, showdown_strengths([player.hand for player in live], state.community_cards)))
+        else:
+            strengths = {live[0]: 0}
+        for amount, eligible in side_pots(state.contributions, live):
+            best = max(strengths[player] for player in eligible)
+            winners = [player for player in eligible if strengths[player] == best]
+            state.pots.append((amount, eligible, winners))
+            for player in winners:
+                if player not in state.winners:
+                    state.winners.append(player)
+        self.emit("result", state)  # Winners known, pots not yet paid out
+
+        for amount, _, winners in state.pots:
+            # Split evenly in multiples of the table's chip; what is left over (less than one chip per winner)
+            # goes to the first winner in seat order
+            share = amount // (self.chip * len(winners)) * self.chip
+            for player in winners:
+                player.chips += share
+            winners[0].chips += amount - share * len(winners)
+        self.emit("hand_end", state)
@@ -0,0 +1,411 @@
+import os
+import random
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from math import comb
+from misc.deck import CARDS, Dealer
+from misc.hand_evaluator import BoardState, HandEvaluator, np
+
+# With NumPy available, trials are dealt and scored in batches, so far more of them fit in a decision
+DEFAULT_SIMULATIONS = 100000 if np is not None else 1000
+BATCH_SIZE = 50000
+BACKENDS = ("serial", "parallel")
+SAMPLING = ("uniform", "stratified", "quasi")  # Strategies other than uniform need NumPy; without it they sample uniformly
+R2_ALPHA = (1 / 1.324717957244746, 1 / 1.324717957244746 ** 2)  # Steps of the 2-D R2 sequence (plastic number)
+# Spots with at most this many (runout, opponent hand) combinations are enumerated instead of sampled.
+# The turn has 46 * 990 = 45,540 and the river 990; the flop's 1,070,190 stays with Monte Carlo.
+EXACT_THRESHOLD = 50000
+
+# Adaptive sampling: first batch size, and how many standard errors separate an estimate from a threshold
+ADAPTIVE_BATCH = 2000
+CONFIDENCE_Z = 2.58  # 99%
+
+EquityEstimate = namedtuple("EquityEstimate", ["equity", "low", "high", "trials"])
+
+_pool = None  # Shared worker processes for the parallel backend, reused across decisions
+_pool_workers = 0
+
+
+def live_cards(dead_cards):
+    dead_cards = set(dead_cards)
+    return [card for card in CARDS if card not in dead_cards]
+
+
+def sample_cards(live, trials, num_cards, rng):
+    # Draws num_cards distinct cards per row
+    return np.asarray(live)[distinct_indices(len(live), trials, num_cards, rng)]
+
+
+def distinct_indices(size, trials, num_cards, rng):
+    # num_cards distinct indices below size per row: uniform indices, redrawing only the rows with a repeat
+    picks = rng.integers(0, size, size=(trials, num_cards))
+    while True:
+        ordered = np.sort(picks, axis=1)
+        repeats = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        count = int(repeats.sum())
+        if count == 0:
+            return picks
+        picks[repeats] = rng.integers(0, size, size=(count, num_cards))
+
+
+def sample_deals(dead_cards, community_cards, trials, rng, sampling="uniform"):
+    # Opponent hands (N, 2) and completed boards (N, 5) that avoid dead_cards. Deals can be scored for several
+    # hero hands with deal_counts, so candidates are compared on common random numbers.
+    #   uniform:    opponent hand and runout drawn independently at random
+    #   stratified: every possible opponent hand gets an equal share of the trials
+    #   quasi:      opponent hand and turn/river cards follow a randomly shifted R2 low-discrepancy sequence
+    if sampling not in SAMPLING:
+        raise ValueError(f"Unknown sampling {sampling!r}, expected one of {SAMPLING}")
+    live = np.array(live_cards(dead_cards))
+    known = len(community_cards)
+    missing = 5 - known
+    board = np.empty((trials, 5), dtype=np.int64)
+    board[:, :known] = community_cards
+
+    if sampling == "uniform":
+        drawn = sample_cards(live, trials, 2 + missing, rng)
+        board[:, known:] = drawn[:, 2:]
+        return drawn[:, :2], board
+
+    pairs = pair_indices(len(live))
+    if sampling == "stratified":
+        combos = np.concatenate([np.repeat(np.arange(len(pairs)), trials // len(pairs)),
+                                 rng.choice(len(pairs), trials % len(pairs), replace=False)])
+        points = None
+    else:
+        points = (rng.random(2) + np.arange(trials)[:, None] * np.array(R2_ALPHA)) % 1.0
+        combos = (points[:, 0] * len(pairs)).astype(np.int64)
+    villain_index = pairs[combos]
+    villain = live[villain_index]
+
+    if points is not None and missing in (1, 2):
+        # Index the runout among the live cards left after the opponent's two, then step over those two
+        rest = len(live) - 2
+        if missing == 1:
+            runout = (points[:, 1] * rest).astype(np.int64)[:, None]
+        else:
+            rest_pairs = pair_indices(rest)
+            runout = rest_pairs[(points[:, 1] * len(rest_pairs)).astype(np.int64)]
+        runout = runout + (runout >= villain_index[:, :1])
+        runout = runout + (runout >= villain_index[:, 1:])
+        board[:, known:] = live[runout]
+    elif missing:
+        dead = np.hstack([villain, np.broadcast_to(np.array(dead_cards), (trials, len(dead_cards)))])
+        board[:, known:] = sample_excluding(dead, missing, rng)
+    return villain, board
+
+
+def deal_counts(hero_hand, villain, board, board_state=None):
+    # Wins and ties for hero_hand over deals from sample_deals. With the known board's BoardState, only the
+    # runout columns of board are scored on top of it.
+    if board_state is None:
+        board_state = BoardState()
+    runout = board[:, len(board_state.cards):]
+    hero = board_state.add(hero_hand).evaluate_batch(runout)
+    villain = board_state.evaluate_batch(np.hstack([villain, runout]))
+    return int((hero > villain).sum()), int((hero == villain).sum())
+
+
+def batch_counts(hero_hand, community_cards, trials, rng, sampling="uniform"):
+    # Wins and ties for hero_hand against one random opponent hand over `trials` random runouts
+    wins = ties = 0
+    board_state = BoardState(community_cards)
+    for start in range(0, trials, BATCH_SIZE):
+        size = min(BATCH_SIZE, trials - start)
+        villain, board = sample_deals(hero_hand + community_cards, community_cards, size, rng, sampling)
+        batch_wins, batch_ties = deal_counts(hero_hand, villain, board, board_state)
+        wins += batch_wins
+        ties += batch_ties
+    return wins, ties
+
+
+def sample_excluding(dead, num_cards, rng):
+    # num_cards distinct cards for each row of dead (an (N, k) card array) that avoid that row's cards
+    picks = rng.integers(0, 52, size=(len(dead), num_cards))
+    while True:
+        ordered = np.sort(np.hstack([dead, picks]), axis=1)
+        redraw = (ordered[:, 1:] == ordered[:, :-1]).any(axis=1)
+        count = int(redraw.sum())
+        if count == 0:
+            return picks
+        picks[redraw] = rng.integers(0, 52, size=(count, num_cards))
+
+
+def showdown_counts(hero_hands, villain_hands, community_cards, rng):
+    # Wins and ties for row-by-row matchups of (N, 2) hand arrays, each with its own random runout
+    hero_hands, villain_hands = np.asarray(hero_hands), np.asarray(villain_hands)
+    size = len(hero_hands)
+    board = np.empty((size, 5), dtype=np.int64)
+    board[:, :len(community_cards)] = community_cards
+    dead = np.hstack([hero_hands, villain_hands, board[:, :len(community_cards)]])
+    board[:, len(community_cards):] = sample_excluding(dead, 5 - len(community_cards), rng)
+    hero = HandEvaluator.evaluate_batch(np.hstack([hero_hands, board]))
+    villain = HandEvaluator.evaluate_batch(np.hstack([villain_hands, board]))
+    return int((hero > villain).sum()), int((hero == villain).sum())
+
+
+def matchup_counts(hero_hand, villain_hand, community_cards, trials, rng):
+    # Wins and ties for hero_hand against a known villain_hand over `trials` random runouts
+    missing = 5 - len(community_cards)
+    board_state = BoardState(community_cards)
+    hero_state, villain_state = board_state.add(hero_hand), board_state.add(villain_hand)
+    if np is None:
+        dealer = Dealer(hero_hand + villain_hand + community_cards, rng)
+        runout = [0] * missing
+        wins = ties = 0
+        for _ in range(trials):
+            dealer.deal_into(runout)
+            hero = hero_state.evaluate(runout)
+            villain = villain_state.evaluate(runout)
+            if hero > villain:
+                wins += 1
+            elif hero == villain:
+                ties += 1
+        return wins, ties
+
+    live = live_cards(hero_hand + villain_hand + community_cards)
+    runout = sample_cards(live, trials, missing, rng)
+    hero = hero_state.evaluate_batch(runout)
+    villain = villain_state.evaluate_batch(runout)
+    return int((hero > villain).sum()), int((hero == villain).sum())
+
+
+def serial_counts(hero_hand, community_cards, trials, rng):
+    # Pure Python version of batch_counts for when NumPy is not installed
+    dealer = Dealer(hero_hand + community_cards, rng)
+    missing = 5 - len(community_cards)
+    board_state = BoardState(community_cards)
+    hero_state = board_state.add(hero_hand)
+    drawn, runout = [0] * (2 + missing), [0] * missing  # The opponent's hand then the runout, and the runout alone
+    wins = ties = 0
+    for _ in range(trials):
+        dealer.deal_into(drawn, runout)
+        hero = hero_state.evaluate(runout)
+        villain = board_state.evaluate(drawn)
+        if hero > villain:
+            wins += 1
+        elif hero == villain:
+            ties += 1
+    return wins, ties
+
+
+def make_rng(seed=None):
+    # seed may be an int or a stream handed out by worker_seeds()
+    if np is not None:
+        return np.random.default_rng(seed)
+    return random.Random(seed)
+
+
+def counts(hero_hand, community_cards, trials, seed=None, sampling="uniform"):
+    # Wins and ties from one RNG stream
+    if np is not None:
+        return batch_counts(hero_hand, community_cards, trials, make_rng(seed), sampling)
+    return serial_counts(hero_hand, community_cards, trials, make_rng(seed))
+
+
+def worker_seeds(seed, num_workers):
+    # Independent, reproducible streams derived from one seed (None draws fresh entropy)
+    if np is not None:
+        return np.random.SeedSequence(seed).spawn(num_workers)
+    if seed is None:
+        return [None] * num_workers
+    return [f"{seed}-{i}" for i in range(num_workers)]
+
+
+def get_pool(workers=None):
+    global _pool, _pool_workers
+    workers = workers or os.cpu_count() or 1
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers)
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown()
+    _pool = None
+    _pool_workers = 0
+
+
+def parallel_counts(hero_hand, community_cards, trials, seed=None, workers=None, sampling="uniform"):
+    # Splits the trials evenly over the pool; the result for a given seed and worker count is reproducible
+    pool = get_pool(workers)
+    shares = [trials // _pool_workers + (1 if i < trials % _pool_workers else 0) for i in range(_pool_workers)]
+    futures = [pool.submit(counts, hero_hand, community_cards, share, stream, sampling)
+               for share, stream in zip(shares, worker_seeds(seed, _pool_workers)) if share]
+    wins = ties = 0
+    for future in futures:
+        share_wins, share_ties = future.result()
+        wins += share_wins
+        ties += share_ties
+    return wins, ties
+
+
+def exact_combinations(num_community_cards):
+    live = 50 - num_community_cards
+    missing = 5 - num_community_cards
+    return comb(live, missing) * comb(live - missing, 2)
+
+
+def exact_counts(hero_hand, community_cards):
+    # Wins, ties and total over every runout and every opponent hand that can go with it
+    live = live_cards(hero_hand + community_cards)
+    missing = 5 - len(community_cards)
+    board_state = BoardState(community_cards)
+    wins = ties = total = 0
+    for runout in combinations(live, missing):
+        state = board_state.add(runout)
+        rest = [card for card in live if card not in runout]
+        hero = state.evaluate(hero_hand)
+        if np is not None:
+            pairs = np.array(rest)[pair_indices(len(rest))]
+            villain = state.evaluate_batch(pairs)
+            wins += int((hero > villain).sum())
+            ties += int((hero == villain).sum())
+            total += len(pairs)
+        else:
+            for pair in combinations(rest, 2):
+                villain = state.evaluate(pair)
+                if hero > villain:
+                    wins += 1
+                elif hero == villain:
+                    ties += 1
+                total += 1
+    return wins, ties, total
+
+
+_pair_indices = {}
+
+
+def pair_indices(num_cards):
+    if num_cards not in _pair_indices:
+        _pair_indices[num_cards] = np.array(list(combinations(range(num_cards), 2)))
+    return _pair_indices[num_cards]
+
+
+def sample_subsets(live, trials, num_cards, rng):
+    # Like sample_cards, for draws of many cards where redrawing rows with a repeat would rarely succeed: each
+    # row takes the first num_cards of a random permutation of live
+    order = np.argsort(rng.random((trials, len(live))), axis=1)[:, :num_cards]
+    return np.asarray(live)[order]
+
+
+def multiway_share(strengths):
+    # Pots won by the first column of an (N, players) strength array, a tie for best paying an equal share
+    best = strengths.max(axis=1)
+    winners = (strengths == best[:, None]).sum(axis=1)
+    return float(((strengths[:, 0] == best) / winners).sum())
+
+
+def multiway_counts(hero_hand, community_cards, opponents, trials, rng):
+    # Pots won against `opponents` random hands over `trials` random deals. Each chunk deals every player's hand
+    # and the runout at once and scores all the hands in one batched evaluator call.
+    board_state = BoardState(community_cards)
+    missing = 5 - len(community_cards)
+    live = live_cards(hero_hand + community_cards)
+    num_cards = 2 * opponents + missing
+    players = opponents + 1
+    won = 0.0
+    chunk = max(BATCH_SIZE // players, 1)
+    for start in range(0, trials, chunk):
+        size = min(chunk, trials - start)
+        if num_cards <= 7:
+            drawn = sample_cards(live, size, num_cards, rng)
+        else:
+            drawn = sample_subsets(live, size, num_cards, rng)
+        hands = np.empty((size, players, 2 + missing), dtype=np.int64)
+        hands[:, 0, :2] = hero_hand
+        hands[:, 1:, :2] = drawn[:, :2 * opponents].reshape(size, opponents, 2)
+        hands[:, :, 2:] = drawn[:, None, 2 * opponents:]
+        strengths = board_state.evaluate_batch(hands.reshape(size * players, 2 + missing)).reshape(size, players)
+        won += multiway_share(strengths)
+    return won
+
+
+def serial_multiway_counts(hero_hand, community_cards, opponents, trials, rng):
+    board_state = BoardState(community_cards)
+    missing = 5 - len(community_cards)
+    dealer = Dealer(hero_hand + community_cards, rng)
+    hero_state = board_state.add(hero_hand)
+    drawn, runout = [0] * (2 * opponents + missing), [0] * missing
+    won = 0.0
+    for _ in range(trials):
+        dealer.deal_into(drawn, runout)
+        hero = hero_state.evaluate(runout)
+        best = max(board_state.evaluate(drawn[2 * i:2 * i + 2] + runout) for i in range(opponents))
+        if hero > best:
+            won += 1.0
+        elif hero == best:
+            tied = sum(board_state.evaluate(drawn[2 * i:2 * i + 2] + runout) == hero for i in range(opponents))
+            won += 1.0 / (tied + 1)
+    return won
+
+
+def multiway_equity(hero_hand, community_cards, opponents, num_simulations=DEFAULT_SIMULATIONS, seed=None):
+    # Share of pots won against `opponents` random hands, split pots paying an equal share; one opponent is
+    # simulate_equity's sampled equity
+    hero_hand, community_cards = list(hero_hand), list(community_cards)
+    if not 1 <= opponents <= 8:
+        raise ValueError(f"opponents must be from 1 to 8, got {opponents}")
+    rng = make_rng(seed)
+    if np is not None:
+        return multiway_counts(hero_hand, community_cards, opponents, num_simulations, rng) / num_simulations
+    return serial_multiway_counts(hero_hand, community_cards, opponents, num_simulations, rng) / num_simulations
+
+
+def simulate_equity(hero_hand, community_cards, num_simulations=DEFAULT_SIMULATIONS, seed=None, backend="serial", workers=None,
+                    exact_threshold=EXACT_THRESHOLD, sampling="uniform"):
+    # Share of pots won against one random hand, counting ties as half a win. Small spots are enumerated exactly
+    if exact_threshold and exact_combinations(len(community_cards)) <= exact_threshold:
+        wins, ties, total = exact_counts(hero_hand, community_cards)
+        return (wins + 0.5 * ties) / total
+
+    if backend == "parallel":
+        wins, ties = parallel_counts(hero_hand, community_cards, num_simulations, seed, workers, sampling)
+    elif backend == "serial":
+        wins, ties = counts(hero_hand, community_cards, num_simulations, seed, sampling)
+    else:
+        raise ValueError(f"Unknown equity backend {backend!r}, expected one of {BACKENDS}")
+    return (wins + 0.5 * ties) / num_simulations
+
+
+def adaptive_equity(hero_hand, community_cards, thresholds=(), max_trials=DEFAULT_SIMULATIONS, time_budget=None,
+                    target_error=0.0, seed=None, exact_threshold=EXACT_THRESHOLD, z=CONFIDENCE_Z, sampling="uniform"):
+    # Samples in growing batches until the confidence interval excludes every threshold (or is narrower than
+    # target_error on each side), or until max_trials or time_budget seconds run out
+    if max_trials <= 0:
+        raise ValueError(f"max_trials must be positive, got {max_trials}")
+    if exact_threshold and exact_combinations(len(community_cards)) <= exact_threshold:
+        wins, ties, total = exact_counts(hero_hand, community_cards)
+        equity = (wins + 0.5 * ties) / total
+        return EquityEstimate(equity, equity, equity, total)
+
+    deadline = time.perf_counter() + time_budget if time_budget else None
+    rng = make_rng(seed)
+    batch = ADAPTIVE_BATCH if np is not None else ADAPTIVE_BATCH // 10
+    trials = wins = ties = 0
+    while trials < max_trials:
+        size = min(batch, max_trials - trials)
+        if np is not None:
+            batch_wins, batch_ties = batch_counts(hero_hand, community_cards, size, rng, sampling)
+        else:
+            batch_wins, batch_ties = serial_counts(hero_hand, community_cards, size, rng)
+        trials += size
+        wins += batch_wins
+        ties += batch_ties
+        batch *= 2
+
+        # Each trial scores 1, 0.5 or 0, so the sum of squares is wins + ties / 4
+        equity = (wins + 0.5 * ties) / trials
+        variance = max((wins + 0.25 * ties) / trials - equity * equity, 0.0)
+        margin = z * (variance / trials) ** 0.5
+        if margin < target_error or (thresholds and all(abs(equity - t) > margin for t in thresholds)):
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+    return EquityEstimate(equity, max(equity - margin, 0.0), min(equity + margin, 1.0), trials)
@@ -0,0 +1,86 @@
+import json
+import threading
+from collections import OrderedDict
+from misc.deck import RANK_BIT, SUIT_OF
+
+
+def canonical_key(hole_cards, community_cards):
+    # Spots that differ only by a relabelling of suits share a key: each suit is reduced to the ranks it holds
+    # in the hole cards and on the board, and the four suits are sorted so their labels no longer matter
+    hole = [0, 0, 0, 0]
+    board = [0, 0, 0, 0]
+    for card in hole_cards:
+        hole[SUIT_OF[card]] |= RANK_BIT[card]
+    for card in community_cards:
+        board[SUIT_OF[card]] |= RANK_BIT[card]
+    return tuple(sorted(zip(hole, board)))
+
+
+class EquityCache:
+    # Bounded LRU of equities keyed by canonical_key, remembering how many trials each estimate used
+    def __init__(self, max_size=65536):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # A bot's background pondering fills the cache while the bot reads it
+
+    def get(self, hole_cards, community_cards, min_trials=0):
+        # Cached equity if it was computed with at least min_trials trials, else None
+        key = canonical_key(hole_cards, community_cards)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[1] < min_trials:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def contains(self, hole_cards, community_cards, min_trials=0):
+        # Like get() but leaves the hit counts and the LRU order alone
+        entry = self.entries.get(canonical_key(hole_cards, community_cards))
+        return entry is not None and entry[1] >= min_trials
+
+    def put(self, hole_cards, community_cards, equity, trials):
+        if self.max_size <= 0:
+            return
+        key = canonical_key(hole_cards, community_cards)
+        with self.lock:
+            self.entries[key] = (equity, trials)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def save(self, path):
+        with self.lock:
+            saved = [[list(map(list, key)), equity, trials] for key, (equity, trials) in self.entries.items()]
+        with open(path, "w") as f:
+            json.dump(saved, f)
+
+    def load(self, path):
+        # Entries from the file are added as least recently used, keeping the current ones
+        with open(path) as f:
+            saved = json.load(f)
+        loaded = OrderedDict((tuple(map(tuple, key)), (equity, trials)) for key, equity, trials in saved)
+        with self.lock:
+            loaded.update(self.entries)
+            self.entries = loaded
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
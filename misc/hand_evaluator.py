@@ -1,4 +1,147 @@
+import threading
 from collections import Counter
+from itertools import combinations_with_replacement
+from misc.deck import PRIMES, PRIME_OF, RANK_BIT, RANK_OF, RANK_VALUE, SUIT_OF
+
+try:
+    import numpy as np
+except ImportError:  # Vectorized evaluation is optional
+    np = None
+
+# Lookup-table evaluator. A hand's strength is a single integer, higher always wins:
+# category << 20 followed by the five deciding ranks (2-14) as 4-bit nibbles, most significant first.
+CATEGORY_SHIFT = 20
+STRAIGHT_MASKS = [(0x1F << low, low + 4) for low in range(8, -1, -1)] + [(0x100F, 3)]  # (mask, top index), wheel last
+
+_flush_table = None  # rank bitmask of one suit -> best flush / straight flush strength (0 if fewer than 5 cards)
+_rank_table = None  # prime product of ranks -> best non-flush strength, for 5, 6 and 7 cards
+_array_tables = None  # NumPy versions of the tables for evaluate_batch
+_build_lock = threading.RLock()  # Threads that need the tables at once wait for one build instead of each building
+
+
+def make_strength(category, ranks):
+    value = category
+    for rank in ranks:
+        value = (value << 4) | rank
+    return value
+
+
+def _straight_top(mask):
+    for straight, top in STRAIGHT_MASKS:
+        if mask & straight == straight:
+            return top
+    return -1
+
+
+def _straight_ranks(top):
+    if top == 3:
+        return [5, 4, 3, 2, 14]
+    return [top + 2 - i for i in range(5)]
+
+
+def _score_flush(mask):
+    top = _straight_top(mask)
+    if top >= 0:
+        return make_strength(8, _straight_ranks(top))
+    ranks = [i + 2 for i in range(12, -1, -1) if mask >> i & 1][:5]
+    return make_strength(5, ranks)
+
+
+def _score_counts(counts):
+    # counts[i] is how many cards of rank index i; the flush case is handled by the flush table
+    by_count = sorted(((count, i) for i, count in enumerate(counts) if count), reverse=True)
+    present = [i for i in range(12, -1, -1) if counts[i]]
+    top_count, top = by_count[0]
+
+    if top_count == 4:
+        kicker = next(i for i in present if i != top)
+        return make_strength(7, [top + 2] * 4 + [kicker + 2])
+
+    if top_count == 3 and by_count[1][0] >= 2:
+        pair = by_count[1][1]
+        return make_strength(6, [top + 2] * 3 + [pair + 2] * 2)
+
+    mask = 0
+    for i in present:
+        mask |= 1 << i
+    straight = _straight_top(mask)
+    if straight >= 0:
+        return make_strength(4, _straight_ranks(straight))
+
+    if top_count == 3:
+        kickers = [i for i in present if i != top][:2]
+        return make_strength(3, [top + 2] * 3 + [k + 2 for k in kickers])
+
+    if top_count == 2 and by_count[1][0] == 2:
+        high, low = by_count[0][1], by_count[1][1]
+        kicker = next(i for i in present if i != high and i != low)
+        return make_strength(2, [high + 2] * 2 + [low + 2] * 2 + [kicker + 2])
+
+    if top_count == 2:
+        kickers = [i for i in present if i != top][:3]
+        return make_strength(1, [top + 2] * 2 + [k + 2 for k in kickers])
+
+    return make_strength(0, [i + 2 for i in present[:5]])
+
+
+def build_tables():
+    if _rank_table is not None:
+        return
+    with _build_lock:
+        if _rank_table is None:
+            _build_tables()
+
+
+def _build_tables():
+    global _flush_table, _rank_table
+    flush_table = [0] * (1 << 13)
+    for mask in range(1 << 13):
+        if bin(mask).count('1') >= 5:
+            flush_table[mask] = _score_flush(mask)
+
+    rank_table = {}
+    for num_cards in (5, 6, 7):
+        for combo in combinations_with_replacement(range(13), num_cards):
+            counts = [0] * 13
+            product = 1
+            for i in combo:
+                counts[i] += 1
+                product *= PRIMES[i]
+            if max(counts) <= 4:
+                rank_table[product] = _score_counts(counts)
+
+    _flush_table, _rank_table = flush_table, rank_table
+
+
+def build_array_tables():
+    global _array_tables
+    if _array_tables is not None:
+        return _array_tables
+    with _build_lock:
+        if _array_tables is None:
+            build_tables()
+            _array_tables = _make_array_tables()
+    return _array_tables
+
+
+def _make_array_tables():
+    products = sorted(_rank_table)
+    return {
+        'flush': np.array(_flush_table, dtype=np.int32),
+        'rank_keys': np.array(products, dtype=np.int64),
+        'rank_values': np.array([_rank_table[p] for p in products], dtype=np.int32),
+        'prime': np.array(PRIME_OF, dtype=np.int64),
+        'bit': np.array(RANK_BIT, dtype=np.int32),
+        'suit': np.array(SUIT_OF, dtype=np.int8),
+    }
+
+
+def strength_category(strength):
+    return strength >> CATEGORY_SHIFT
+
+
+def strength_ranks(strength):
+    return [(strength >> shift) & 0xF for shift in (16, 12, 8, 4, 0)]
 
 class HandEvaluator:
     def __init__(self):
@@ -7,25 +150,17 @@ class HandEvaluator:
     @staticmethod
     def hand_type(hand_rank):
         hand_types = ["High Card", "One Pair", "Two Pair", "Three of a Kind", "Straight", "Flush", "Full House", "Four of a Kind", "Straight Flush"]
+        if hand_rank >= len(hand_types):  # Full strength integer from evaluate()
+            hand_rank = strength_category(hand_rank)
         return hand_types[hand_rank]
 
     @staticmethod
     def card_rank(card):
-        rank = card.rank  # Access the rank attribute directly
-        if rank == 'A':
-            return 14
-        elif rank == 'K':
-            return 13
-        elif rank == 'Q':
-            return 12
-        elif rank == 'J':
-            return 11
-        else:
-            return int(rank)
+        return RANK_VALUE[card]
 
     @staticmethod
     def card_suit(card):
-        return card.suit  # Access the suit attribute directly
+        return SUIT_OF[card]
 
     @staticmethod
     def is_straight_flush(hand):
@@ -70,8 +205,67 @@ class HandEvaluator:
         ranks = [HandEvaluator.card_rank(card) for card in hand]
         return 2 in Counter(ranks).values()
 
+    @staticmethod
+    def evaluate(cards):
+        # Strength of the best 5-card hand out of 5, 6 or 7 cards: one dict lookup plus one list lookup per suit
+        if _rank_table is None:
+            build_tables()
+        product = 1
+        suit_masks = [0, 0, 0, 0]
+        for card in cards:
+            product *= PRIME_OF[card]
+            suit_masks[SUIT_OF[card]] |= RANK_BIT[card]
+        strength = _rank_table[product]
+        for mask in suit_masks:
+            flush = _flush_table[mask]
+            if flush > strength:
+                strength = flush
+        return strength
+
+    @staticmethod
+    def evaluate_batch(cards):
+        # Vectorized evaluate(): cards is an (N, 5-7) integer array, returns N strengths
+        tables = build_array_tables()
+        cards = np.asarray(cards)
+        products = np.prod(tables['prime'][cards], axis=1)
+        strengths = tables['rank_values'][np.searchsorted(tables['rank_keys'], products)]
+        bits = tables['bit'][cards]
+        suits = tables['suit'][cards]
+        for suit in range(4):
+            masks = np.where(suits == suit, bits, 0).sum(axis=1)
+            np.maximum(strengths, tables['flush'][masks], out=strengths)
+        return strengths
+
     @staticmethod
     def best_hand(player_hand, community_cards):
+        # Compatibility wrapper around evaluate(): (category, best five cards ordered by significance),
+        # so comparing card ranks in order breaks ties correctly
+        all_cards = player_hand + community_cards
+        if len(all_cards) < 5:
+            return (0, [])
+        if len(all_cards) > 7 or len(set(all_cards)) != len(all_cards):
+            # No prime product covers these; score them the old way rather than fail
+            return HandEvaluator.best_hand_enumerated(player_hand, community_cards)
+        strength = HandEvaluator.evaluate(all_cards)
+        category = strength_category(strength)
+
+        candidates = all_cards
+        if category in (5, 8):
+            suits = Counter(SUIT_OF[card] for card in all_cards)
+            flush_suit = suits.most_common(1)[0][0]
+            candidates = [card for card in all_cards if SUIT_OF[card] == flush_suit]
+
+        best = []
+        remaining = list(candidates)
+        for rank in strength_ranks(strength):
+            card = next(card for card in remaining if RANK_VALUE[card] == rank)
+            remaining.remove(card)
+            best.append(card)
+        return (category, best)
+
+    @staticmethod
+    def best_hand_enumerated(player_hand, community_cards):
+        # Original evaluator: scores all 5-card subsets one by one. Kept as a reference for validation
         all_cards = player_hand + community_cards
         best = []
         best_rank = (0, [])
@@ -106,3 +300,92 @@ class HandEvaluator:
                             best_rank = max(best_rank, current_best_rank, key=lambda x: (x[0], [HandEvaluator.card_rank(card) for card in x[1]]))
 
         return best_rank
+
+
+_mask_ranks = {}  # Rank bitmask -> its rank values, filled as masks come up
+
+
+class BoardState:
+    # Features of a fixed set of cards (usually the board on one street), computed once and then extended by the
+    # cards that vary, such as each trial's hole cards and runout: evaluating costs one step per added card
+    # whatever the size of the board.
+    __slots__ = ("cards", "product", "suit_masks", "rank_counts", "suit_counts", "rank_mask")
+
+    def __init__(self, cards=()):
+        self.cards = list(cards)
+        self.product = 1
+        self.suit_masks = [0, 0, 0, 0]  # Rank bitmask held in each suit
+        self.rank_counts = [0] * 13  # Rank histogram, by rank index (0 is a deuce)
+        self.suit_counts = [0, 0, 0, 0]
+        self.rank_mask = 0  # Ranks present in any suit
+        self._extend(self.cards)
+
+    def _extend(self, cards):
+        product, suit_masks, rank_counts, suit_counts, rank_mask = (self.product, self.suit_masks, self.rank_counts,
+                                                                     self.suit_counts, self.rank_mask)
+        for card in cards:
+            suit = SUIT_OF[card]
+            product *= PRIME_OF[card]
+            suit_masks[suit] |= RANK_BIT[card]
+            suit_counts[suit] += 1
+            rank_counts[RANK_OF[card]] += 1
+            rank_mask |= RANK_BIT[card]
+        self.product = product
+        self.rank_mask = rank_mask
+
+    def add(self, cards):
+        # New state with more cards, e.g. the hero's hand on top of the board, or the next street's card
+        state = BoardState.__new__(BoardState)
+        state.cards = self.cards + list(cards)
+        state.product = self.product
+        state.suit_masks = self.suit_masks[:]
+        state.rank_counts = self.rank_counts[:]
+        state.suit_counts = self.suit_counts[:]
+        state.rank_mask = self.rank_mask
+        state._extend(cards)
+        return state
+
+    def max_suit_count(self):
+        return max(self.suit_counts)
+
+    def ranks(self):
+        # Distinct rank values (2-14) present, ascending
+        ranks = _mask_ranks.get(self.rank_mask)
+        if ranks is None:
+            ranks = _mask_ranks[self.rank_mask] = [rank + 2 for rank in range(13) if self.rank_mask >> rank & 1]
+        return list(ranks)
+
+    def straight_counts(self):
+        # How many ranks of each five-rank straight window are present, in STRAIGHT_MASKS order (wheel last)
+        return [bin(self.rank_mask & mask).count('1') for mask, _ in STRAIGHT_MASKS]
+
+    def evaluate(self, cards):
+        # HandEvaluator.evaluate(self.cards + cards), reusing the work on self.cards
+        if _rank_table is None:
+            build_tables()
+        product = self.product
+        suit_masks = list(self.suit_masks)
+        for card in cards:
+            product *= PRIME_OF[card]
+            suit_masks[SUIT_OF[card]] |= RANK_BIT[card]
+        strength = _rank_table[product]
+        for mask in suit_masks:
+            flush = _flush_table[mask]
+            if flush > strength:
+                strength = flush
+        return strength
+
+    def evaluate_batch(self, cards):
+        # HandEvaluator.evaluate_batch on self.cards plus each row of cards, an (N, k) array
+        tables = build_array_tables()
+        cards = np.asarray(cards)
+        products = np.prod(tables['prime'][cards], axis=1) * self.product
+        strengths = tables['rank_values'][np.searchsorted(tables['rank_keys'], products)]
+        bits = tables['bit'][cards]
+        suits = tables['suit'][cards]
+        for suit in range(4):
+            if self.suit_counts[suit] + cards.shape[1] < 5:  # No flush possible in this suit
+                continue
+            masks = np.where(suits == suit, bits, 0).sum(axis=1) | self.suit_masks[suit]
+            np.maximum(strengths, tables['flush'][masks], out=strengths)
+        return strengths
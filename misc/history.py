@@ -0,0 +1,386 @@
+# Compact hand histories: a Table listener that appends every finished hand to a binary log, a reader that
+# memory-maps the log instead of loading it, and an exporter to the usual text hand-history format.
+#
+# A log is two files of fixed-size little-endian records, so a hand is found by offset and whole columns can be
+# viewed as NumPy arrays without parsing:
+#   <path>          header (magic, version, seat names), then one HAND record per hand
+#   <path>.actions  one ACTION record per betting action; each hand points at its run of actions
+# Cards are stored as their 0-51 index (NO_CARD pads short boards), actions as ACTION_CODES and chip amounts
+# as integer hundredths.
+#
+#   python -m misc.history hands.log                  summary of a log
+#   python -m misc.history hands.log --text out.txt   export as text hand histories
+import argparse
+import mmap
+import os
+import struct
+import sys
+from collections import namedtuple
+from misc.deck import CARDS, SUIT_OF
+from misc.engine import STREETS
+try:
+    import numpy as np
+except ImportError:  # Only needed for columns()
+    np = None
+
+MAGIC = b"PKHH"
+VERSION = 1
+HEADER = struct.Struct("<4sH32s32s")  # magic, version, player1 name, player2 name
+HAND = struct.Struct("<IBbBBiiiiiii4s5sQH")
+ACTION = struct.Struct("<BBBi")  # street, seat, action code, chips added
+NO_CARD = 0xFF
+CHIP_SCALE = 100
+FLUSH_EVERY = 1000
+ACTIONS = ("fold", "check", "call", "raise")
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+SUIT_LETTERS = "cdhs"  # In the order of deck.SUITS
+
+# HAND fields in order: winner is the winning seat or -1 for a split pot, showdown is 0 when someone folded,
+# hole is player1's two cards then player2's, and a hand's actions are ACTION records first_action onwards
+if np is not None:
+    HAND_DTYPE = np.dtype([("hand_num", "<u4"), ("dealer", "u1"), ("winner", "i1"), ("board_len", "u1"),
+                           ("showdown", "u1"), ("small_blind", "<i4"), ("big_blind", "<i4"), ("start1", "<i4"),
+                           ("start2", "<i4"), ("end1", "<i4"), ("end2", "<i4"), ("pot", "<i4"),
+                           ("hole", "u1", (4,)), ("board", "u1", (5,)), ("first_action", "<u8"),
+                           ("num_actions", "<u2")])
+    ACTION_DTYPE = np.dtype([("street", "u1"), ("seat", "u1"), ("action", "u1"), ("amount", "<i4")])
+
+# A decoded hand; chip amounts are back in chips, cards are Card objects and seats are 0 (player1) or 1 (player2)
+HandRecord = namedtuple("HandRecord", ["hand_num", "dealer", "winner", "showdown", "small_blind", "big_blind",
+                                       "start_stacks", "end_stacks", "pot", "hole_cards", "board", "actions"])
+
+
+def to_units(chips):
+    return int(round(chips * CHIP_SCALE))
+
+
+def from_units(units):
+    return units / CHIP_SCALE
+
+
+def actions_path(path):
+    return path + ".actions"
+
+
+def encode_name(name):
+    return name.encode("utf-8")[:32]
+
+
+def decode_name(raw):
+    return raw.rstrip(b"\0").decode("utf-8", "replace")
+
+
+def encode_cards(cards, size):
+    return bytes(cards) + bytes([NO_CARD]) * (size - len(cards))
+
+
+def decode_cards(raw):
+    return [CARDS[c] for c in raw if c != NO_CARD]
+
+
+class HandHistoryWriter:
+    # Listener for misc.engine.Table: table.add_listener(HandHistoryWriter("hands.log")).
+    # Records are buffered in memory and appended every flush_every hands, actions before hands, so the files
+    # on disk always end on a whole hand. Reopening an existing log appends to it, dropping any cut-off record.
+    def __init__(self, path, flush_every=FLUSH_EVERY):
+        self.path = path
+        self.flush_every = flush_every
+        self.hands = bytearray()
+        self.actions = bytearray()
+        self.pending = 0
+        self.start_stacks = None
+        self.names = None
+        self.hand_file = self.action_file = None
+        self.num_hands = self.num_actions = 0
+        self.closed = False
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            self.open_existing()
+
+    def open_existing(self):
+        self.hand_file = open(self.path, "r+b")
+        magic, version, name1, name2 = HEADER.unpack(self.hand_file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} hand history log")
+        self.names = (decode_name(name1), decode_name(name2))
+        self.num_hands = (os.path.getsize(self.path) - HEADER.size) // HAND.size
+        if self.num_hands:
+            self.hand_file.seek(HEADER.size + (self.num_hands - 1) * HAND.size)
+            last = HAND.unpack(self.hand_file.read(HAND.size))
+            self.num_actions = last[-2] + last[-1]
+        # Actions are flushed before hands, so the actions file can run past the last hand but never stop short
+        # of it; truncate() would pad a short file with zeros that read back as actions
+        actions_size = os.path.getsize(actions_path(self.path)) if os.path.exists(actions_path(self.path)) else 0
+        if actions_size < self.num_actions * ACTION.size:
+            self.hand_file.close()
+            raise ValueError(f"{actions_path(self.path)} has {actions_size // ACTION.size} actions, "
+                             f"the hands in {self.path} need {self.num_actions}")
+        self.hand_file.truncate(HEADER.size + self.num_hands * HAND.size)
+        self.hand_file.seek(0, os.SEEK_END)
+        self.action_file = open(actions_path(self.path), "a+b")
+        self.action_file.truncate(self.num_actions * ACTION.size)
+
+    def create(self, state):
+        self.names = (state.player1.name, state.player2.name)
+        self.hand_file = open(self.path, "wb")
+        self.hand_file.write(HEADER.pack(MAGIC, VERSION, encode_name(self.names[0]), encode_name(self.names[1])))
+        self.action_file = open(actions_path(self.path), "wb")
+
+    def __call__(self, event, state, **details):
+        if event == "hand_start":
+            self.start_stacks = (state.player1.chips, state.player2.chips)  # Before the blinds go in
+        elif event == "hand_end":
+            self.record(state)
+
+    def record(self, state):
+        if self.closed:
+            raise ValueError(f"hand history {self.path} is closed")
+        if self.hand_file is None:
+            self.create(state)
+        player1, player2 = state.player1, state.player2
+        start = self.start_stacks or (player1.chips, player2.chips)
+        first_action = self.num_actions
+        for street, player, action, amount in state.actions:
+            self.actions += ACTION.pack(street, 0 if player is player1 else 1, ACTION_CODES[action], to_units(amount))
+        self.num_actions += len(state.actions)
+        winner = -1 if state.winner is None else (0 if state.winner is player1 else 1)
+        self.hands += HAND.pack(state.hand_num, 0 if state.dealer is player1 else 1, winner,
+                                len(state.community_cards), 0 if player1.folded or player2.folded else 1,
+                                to_units(state.small_blind), to_units(state.big_blind),
+                                to_units(start[0]), to_units(start[1]), to_units(player1.chips),
+                                to_units(player2.chips), to_units(state.pot),
+                                bytes(player1.hand + player2.hand), encode_cards(state.community_cards, 5),
+                                first_action, len(state.actions))
+        self.num_hands += 1
+        self.start_stacks = None
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.hand_file is None:
+            return
+        self.action_file.write(self.actions)
+        self.action_file.flush()
+        self.hand_file.write(self.hands)
+        self.hand_file.flush()
+        self.actions.clear()
+        self.hands.clear()
+        self.pending = 0
+
+    def close(self):
+        self.flush()
+        for f in (self.hand_file, self.action_file):
+            if f is not None:
+                f.close()
+        self.hand_file = self.action_file = None
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def map_file(path):
+    # mmap cannot map an empty file
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class HandHistoryReader:
+    # Memory-maps a log: len(reader), reader[i] and iteration decode one hand at a time, so logs of millions
+    # of hands are read without being loaded. A hand still being written is not visible until it is flushed.
+    def __init__(self, path):
+        self.path = path
+        self.hand_map = map_file(path)
+        if len(self.hand_map) < HEADER.size:
+            raise ValueError(f"{path} is not a hand history log")
+        magic, version, name1, name2 = HEADER.unpack_from(self.hand_map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} hand history log")
+        self.names = (decode_name(name1), decode_name(name2))
+        self.action_map = map_file(actions_path(path)) if os.path.exists(actions_path(path)) else b""
+        self.num_hands = (len(self.hand_map) - HEADER.size) // HAND.size
+        # Keep only hands whose actions are all on disk
+        while self.num_hands:
+            last = HAND.unpack_from(self.hand_map, HEADER.size + (self.num_hands - 1) * HAND.size)
+            if (last[-2] + last[-1]) * ACTION.size <= len(self.action_map):
+                break
+            self.num_hands -= 1
+
+    def __len__(self):
+        return self.num_hands
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.num_hands
+        if not 0 <= index < self.num_hands:
+            raise IndexError("hand index out of range")
+        return self.decode(HAND.unpack_from(self.hand_map, HEADER.size + index * HAND.size))
+
+    def __iter__(self):
+        for index in range(self.num_hands):
+            yield self.decode(HAND.unpack_from(self.hand_map, HEADER.size + index * HAND.size))
+
+    def decode(self, fields):
+        (hand_num, dealer, winner, board_len, showdown, small_blind, big_blind, start1, start2, end1, end2, pot,
+         hole, board, first_action, num_actions) = fields
+        actions = []
+        offset = first_action * ACTION.size
+        for street, seat, code, amount in ACTION.iter_unpack(self.action_map[offset:offset + num_actions * ACTION.size]):
+            actions.append((street, seat, ACTIONS[code], from_units(amount)))
+        return HandRecord(hand_num, dealer, None if winner < 0 else winner, bool(showdown),
+                          from_units(small_blind), from_units(big_blind), (from_units(start1), from_units(start2)),
+                          (from_units(end1), from_units(end2)), from_units(pot),
+                          (decode_cards(hole[:2]), decode_cards(hole[2:])), decode_cards(board[:board_len]), actions)
+
+    def columns(self):
+        # Zero-copy NumPy views of every HAND and ACTION record (fields as in HAND_DTYPE / ACTION_DTYPE, amounts
+        # in hundredths of a chip): e.g. hands["pot"].mean() or hands["winner"] without decoding any hand
+        if np is None:
+            raise RuntimeError("columns() needs NumPy")
+        hands = np.frombuffer(self.hand_map, HAND_DTYPE, count=self.num_hands, offset=HEADER.size)
+        num_actions = len(self.action_map) // ACTION.size
+        actions = np.frombuffer(self.action_map, ACTION_DTYPE, count=num_actions)
+        return hands, actions
+
+    def close(self):
+        for m in (self.hand_map, self.action_map):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def card_text(card):
+    rank = card.rank
+    return ("T" if rank == "10" else rank) + SUIT_LETTERS[SUIT_OF[card]]
+
+
+def chips_text(chips):
+    return f"{chips:.2f}".rstrip("0").rstrip(".")
+
+
+def cards_text(cards):
+    return "[" + " ".join(card_text(c) for c in cards) + "]"
+
+
+def format_hand(record, names, table_name="Poker-AI"):
+    # One hand in the PokerStars-style text format most hand-history tools read
+    sb, bb = record.small_blind, record.big_blind
+    dealer = record.dealer
+    first = 1 - dealer  # The dealer's opponent posts the small blind
+    lines = [f"PokerStars Hand #{record.hand_num}: Hold'em No Limit ({chips_text(sb)}/{chips_text(bb)})",
+             f"Table '{table_name}' 2-max Seat #{dealer + 1} is the button"]
+    for seat in (0, 1):
+        lines.append(f"Seat {seat + 1}: {names[seat]} ({chips_text(record.start_stacks[seat])} in chips)")
+    lines.append(f"{names[first]}: posts small blind {chips_text(sb)}")
+    lines.append(f"{names[dealer]}: posts big blind {chips_text(bb)}")
+    lines.append("*** HOLE CARDS ***")
+    for seat in (0, 1):
+        lines.append(f"Dealt to {names[seat]} {cards_text(record.hole_cards[seat])}")
+
+    bets = [0.0, 0.0]
+    bets[first], bets[dealer] = sb, bb
+    street = 0
+    board = record.board
+    for action_street, seat, action, amount in record.actions:
+        while street < action_street:
+            street += 1
+            bets = [0.0, 0.0]
+            lines.append(street_line(street, board))
+        name = names[seat]
+        if action == "fold":
+            lines.append(f"{name}: folds")
+        elif action == "check":
+            lines.append(f"{name}: checks")
+        elif action == "call":
+            bets[seat] += amount
+            lines.append(f"{name}: calls {chips_text(amount)}")
+        else:
+            facing = bets[1 - seat]
+            bets[seat] += amount
+            if facing == 0:
+                lines.append(f"{name}: bets {chips_text(amount)}")
+            else:
+                lines.append(f"{name}: raises {chips_text(bets[seat] - facing)} to {chips_text(bets[seat])}")
+    while record.showdown and street < 3:  # The engine deals the board out even after a fold; skip it then
+        street += 1
+        lines.append(street_line(street, board))
+
+    if record.showdown:
+        lines.append("*** SHOW DOWN ***")
+        for seat in (first, dealer):
+            lines.append(f"{names[seat]}: shows {cards_text(record.hole_cards[seat])}")
+    if record.winner is None:
+        for seat in (0, 1):
+            lines.append(f"{names[seat]} collected {chips_text(int(record.pot / 2))} from pot")
+    else:
+        lines.append(f"{names[record.winner]} collected {chips_text(record.pot)} from pot")
+    lines.append("*** SUMMARY ***")
+    lines.append(f"Total pot {chips_text(record.pot)} | Rake 0")
+    if street:
+        lines.append(f"Board {cards_text(board[:street + 2])}")
+    return "\n".join(lines) + "\n"
+
+
+def street_line(street, board):
+    # street is an index into STREETS; each line shows the earlier cards, then the new one in its own brackets
+    name = STREETS[street].upper()
+    if street == 1:
+        return f"*** {name} *** {cards_text(board[:3])}"
+    return f"*** {name} *** {cards_text(board[:street + 1])} [{card_text(board[street + 1])}]"
+
+
+def export_text(reader, out, limit=None, table_name="Poker-AI"):
+    for index, record in enumerate(reader):
+        if limit is not None and index >= limit:
+            break
+        out.write(format_hand(record, reader.names, table_name))
+        out.write("\n\n")
+
+
+def summary(reader):
+    if np is not None:
+        hands, actions = reader.columns()
+        count = len(hands)
+        showdowns = int(hands["showdown"].sum())
+        mean_pot = float(hands["pot"].mean()) / CHIP_SCALE if count else 0.0
+        num_actions = int(hands["num_actions"].sum())
+    else:
+        count = showdowns = num_actions = 0
+        total_pot = 0.0
+        for record in reader:
+            count += 1
+            showdowns += record.showdown
+            total_pot += record.pot
+            num_actions += len(record.actions)
+        mean_pot = total_pot / count if count else 0.0
+    return {"hands": count, "showdowns": showdowns, "mean_pot": mean_pot, "actions": num_actions}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--text", help="write text hand histories to this file ('-' for stdout)")
+    parser.add_argument("--limit", type=int, help="export at most this many hands")
+    args = parser.parse_args()
+
+    with HandHistoryReader(args.path) as reader:
+        if args.text:
+            if args.text == "-":
+                export_text(reader, sys.stdout, args.limit)
+            else:
+                with open(args.text, "w") as out:
+                    export_text(reader, out, args.limit)
+        else:
+            stats = summary(reader)
+            print(f"{reader.names[0]} vs {reader.names[1]}: {stats['hands']:,} hands, {stats['showdowns']:,} "
+                  f"showdowns, {stats['actions']:,} actions, mean pot {stats['mean_pot']:.2f}")
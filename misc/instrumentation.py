@@ -0,0 +1,168 @@
+# Timers, counters and trace events for the bot's hot paths. A disabled Metrics costs one attribute check
+# per call, so instrumentation can stay in place in production and in self-play.
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class _Timer:
+    __slots__ = ("metrics", "key", "start")
+
+    def __init__(self, metrics, key):
+        self.metrics = metrics
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe_key(self.key, time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())))
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Metrics:
+    def __init__(self, enabled=True, trace_limit=10000, sinks=()):
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}  # key -> [bucket counts..., sum, count]
+        self.events = deque(maxlen=trace_limit)  # Latest trace events, oldest dropped first
+        self.sinks = list(sinks)  # Callables that receive every trace event as it happens
+        self.lock = threading.Lock()
+
+    def count(self, name, value=1, **labels):
+        if not self.enabled:
+            return
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def timer(self, name, **labels):
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, _key(name, labels))
+
+    def observe(self, name, seconds, **labels):
+        if self.enabled:
+            self.observe_key(_key(name, labels), seconds)
+
+    def observe_key(self, key, seconds):
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * len(BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+                    break
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def event(self, name, **fields):
+        if not self.enabled:
+            return
+        record = dict(fields, event=name, time=time.time())
+        self.events.append(record)
+        for sink in self.sinks:
+            sink(record)
+
+    def reset(self):
+        with self.lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.events.clear()
+
+    def prometheus_text(self):
+        lines = []
+        with self.lock:
+            family = None
+            for (name, labels), value in sorted(self.counters.items()):
+                if name != family:  # One TYPE line per metric family, before its first series
+                    lines.append(f"# TYPE {name} counter")
+                    family = name
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name != family:
+                    lines.append(f"# TYPE {name} histogram")
+                    family = name
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS, histogram):
+                    cumulative += bucket
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram[-2]}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in self.counters.items()],
+                "histograms": [{"name": name, "labels": dict(labels), "buckets": dict(zip(map(str, BUCKETS), histogram)),
+                                "sum": histogram[-2], "count": histogram[-1]}
+                               for (name, labels), histogram in self.histograms.items()],
+            }
+
+    def write(self, path):
+        # JSON for .json paths, Prometheus text exposition format otherwise
+        with open(path, "w") as f:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), f, indent=2)
+            else:
+                f.write(self.prometheus_text())
+
+    def serve(self, port=9100, host="127.0.0.1"):
+        # Serves prometheus_text() at /metrics from a daemon thread; returns the server so it can be shut down
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+DISABLED = Metrics(enabled=False)  # Default for players that were not given a Metrics
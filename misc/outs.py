@@ -0,0 +1,76 @@
+# Exact outs: every unseen card is dealt onto the hand and scored, instead of guessing outs from suit counts and
+# rank gaps. An out is a card that lifts the hand to a better class (pair, two pair, ...) that the board alone does
+# not make, so a card that only pairs or completes the board is not counted. by_river also enumerates every
+# turn and river pair on the flop, so gutshots, overlapping draws and runner-runner backdoors come out exact.
+#
+#   outs = find_outs(hand, board)
+#   outs.cards       {card: "Flush", ...}
+#   outs.next_card   chance the next card is an out
+#   outs.by_river    chance of having improved by the river
+from collections import namedtuple
+from misc.equity import live_cards, pair_indices
+from misc.hand_evaluator import CATEGORY_SHIFT, BoardState, HandEvaluator, np, strength_category
+
+Outs = namedtuple("Outs", "category cards next_card by_river")  # category: the hand's class now, as an index
+
+
+def count_category(rank_counts):
+    # Class of fewer than five cards, where only the rank counts matter
+    counts = sorted(rank_counts, reverse=True)
+    if counts[0] == 4:
+        return 7
+    if counts[0] == 3:
+        return 3
+    if counts[0] == 2:
+        return 2 if counts[1] == 2 else 1
+    return 0
+
+
+def category(state):
+    if len(state.cards) < 5:
+        return count_category(state.rank_counts)
+    return strength_category(state.evaluate(()))
+
+
+def find_outs(hand, community_cards, board_state=None):
+    # Outs on the next card, and on the next two on the flop. Preflop and on the river there is nothing to count.
+    # board_state, when given, is the BoardState of community_cards
+    hand, community_cards = list(hand), list(community_cards)
+    board = board_state or BoardState(community_cards)
+    hero = board.add(hand)
+    current = category(hero)
+    if not 3 <= len(community_cards) < 5:
+        return Outs(current, {}, 0.0, 0.0)
+    # An out has to widen the gap between the hand's class and the board's: a card that pairs the board lifts
+    # both by the same step, so it only counts when the hole cards make more of it (a set filling up, say)
+    lead = current - category(board)
+    live = live_cards(hand + community_cards)
+    cards = {}
+    for card in live:
+        made = strength_category(hero.evaluate((card,)))
+        if made - category(board.add((card,))) > lead:
+            cards[card] = HandEvaluator.hand_type(made)
+    next_card = len(cards) / len(live)
+    if len(community_cards) == 4:
+        return Outs(current, cards, next_card, next_card)
+    return Outs(current, cards, next_card, runout_odds(hero, board, live, lead))
+
+
+def runout_odds(hero, board, live, lead):
+    # Share of the turn and river pairs after which the hand's class is further ahead of the board's than lead,
+    # its lead on the flop
+    if np is not None:
+        pairs = np.array(live)[pair_indices(len(live))]
+        made = hero.evaluate_batch(pairs) >> CATEGORY_SHIFT
+        improved = made > lead  # The board's class is never negative, so only these can have gained
+        shared = board.evaluate_batch(pairs[improved]) >> CATEGORY_SHIFT
+        return float((made[improved] - shared > lead).sum() / len(pairs))
+    improved = total = 0
+    for i, turn in enumerate(live):
+        hero_turn = hero.add((turn,))
+        board_turn = board.add((turn,))
+        for river in live[i + 1:]:
+            made = strength_category(hero_turn.evaluate((river,)))
+            improved += made > lead and made - strength_category(board_turn.evaluate((river,))) > lead
+            total += 1
+    return improved / total
@@ -0,0 +1,406 @@
+from misc.hand_evaluator import BoardState, HandEvaluator
+from misc.equity import (DEFAULT_SIMULATIONS, EXACT_THRESHOLD, adaptive_equity, exact_combinations, multiway_equity,
+                         simulate_equity)
+from misc.equity_cache import EquityCache
+from misc.instrumentation import DISABLED
+from misc.outs import find_outs
+from misc.preflop import preflop_equity
+from misc.texture import board_texture
+from misc.ranges import Range, exact_range_equity, range_equity
+from misc.search import RAISE_SIZES as SEARCH_RAISES, SearchState, search
+from misc.strategy import BOARD_SIZES, RAISE_SIZES, choose_move, hand_strength, policy
+import time
+import random
+from math import comb
+
+ACTIONS = {1: ("check", "raise"), 2: ("call", "fold"), 3: ("call", "raise", "fold")}
+BOARD_STREETS = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}  # Street by number of community cards
+# Cut-offs behind AIPlayer's decisions, overridable per bot for tuning
+DECISION_THRESHOLDS = {
+    "all_in_call": 0.75,  # Always call an all in above this equity
+    "dangerous_raise": 0.7,  # Minimum equity to raise on a dangerous board
+    "safe_play": 0.5,  # Minimum equity to continue (and raise) on a safe board
+    "draw_raise": 0.55,  # Minimum equity to raise on a draw-heavy board
+    "strong_raise": 1.2,  # Equity + aggressiveness above this sizes the raise as a very strong hand
+    "moderate_raise": 1.0,  # Equity + aggressiveness above this sizes the raise as a moderate hand
+}
+
+class Player:
+    def __init__(self, name, chips):
+        self.name = name
+        self.chips = chips
+        self.hand = []
+        self.current_bet = 0
+        self.folded = False
+
+    def bet(self, amount):
+        self.chips -= amount
+        self.current_bet += amount
+
+    def fold(self):
+        self.folded = True
+
+    def check(self):
+        pass
+
+    def call(self, hero_bet, villain_bet):
+        call_amount = villain_bet - hero_bet
+        self.bet(call_amount)
+        return call_amount
+
+    # Agent hooks the engine calls. type 1: check or raise, 2: call or fold (facing all in), 3: call, raise or fold
+    def choose_action(self, state, opponent, type):
+        raise NotImplementedError
+
+    def choose_raise(self, state, opponent):
+        # Chips to add this action; the player must have bet them already
+        raise NotImplementedError
+
+class AIPlayer(Player):
+    def __init__(self, name, chips, num_simulations=DEFAULT_SIMULATIONS, equity_backend="serial", workers=None,
+                 exact_threshold=EXACT_THRESHOLD, preflop_table=True, equity_cache=None, adaptive=False, time_budget=None,
+                 sampling="uniform", aggressiveness=0.5, seed=None, metrics=None, think_time=0, thresholds=None,
+                 opponent_model=False, strategy=False, search_time=None):
+        super().__init__(name, chips)
+        self.thresholds = dict(DECISION_THRESHOLDS, **(thresholds or {}))
+        self.aggressiveness = aggressiveness  # 0.1 to 1.0, the chance of raising or calling light when the spot allows it
+        self.rng = random.Random(seed)
+        self.metrics = metrics or DISABLED  # misc.instrumentation.Metrics for stage timings, counters and decision traces
+        self.think_time = think_time  # Seconds to pause before acting, so a console player can follow along
+        self.num_simulations = num_simulations
+        self.equity_backend = equity_backend  # "parallel" spreads the trials over a shared process pool
+        self.workers = workers
+        self.exact_threshold = exact_threshold  # Enumerate spots this small exactly (turn and river by default); 0 always samples
+        self.preflop_table = preflop_table  # Look preflop equity up in data/preflop_equity.bin when it has been built
+        self.equity_cache = equity_cache if equity_cache is not None else EquityCache()  # Pass one cache to share it between bots
+        self.adaptive = adaptive  # Stop sampling once the estimate is clearly on one side of the thresholds being compared
+        self.time_budget = time_budget  # Seconds of sampling allowed per adaptive estimate
+        self.last_estimate = None  # EquityEstimate of the latest adaptive simulation, for logging
+        self.sampling = sampling  # "stratified" or "quasi" reach the same accuracy with fewer trials
+        self.board_state = None  # BoardState cached by street_state()
+        self.ponderer = None  # misc.ponder.Ponderer filling equity_cache in the background, once one is attached
+        # With opponent_model, equity is taken against the opponent's range as narrowed by their actions this hand
+        # (misc.ranges) rather than against any two cards
+        self.opponent_range = Range() if opponent_model else None
+        self.range_state = None  # HandState the range belongs to
+        self.range_seen = 0  # Actions of range_state already applied to the range
+        self.opponents = 1  # Opponents still in the hand at the current decision (misc.engine.RingTable)
+        # With strategy, decisions are drawn from the precomputed table in data/strategy.bin (misc.strategy) with no
+        # equity simulation; without the table the bot decides as usual
+        self.strategy = strategy
+        self.raise_size = None  # Raise size of the table's last move, as a share of the pot after calling
+        # Seconds of tree search (misc.search) per heads-up decision instead of the equity thresholds; None to not search
+        self.search_time = search_time
+        self.search_amount = None  # Chips for the raise the last search chose
+        self.last_search = None  # SearchResult of the latest search, for logging
+
+    def evaluate_hand_strength(self, community_cards):
+        evaluator = HandEvaluator()
+        best_hand = evaluator.best_hand(self.hand, community_cards)
+        hand_rank = best_hand[0]
+        return hand_rank
+
+    def pot_odds(self, call_amount, pot):
+        return call_amount / (pot + call_amount)
+
+    def expected_value(self, hand_strength, pot, call_amount):
+        return hand_strength * pot - call_amount
+    
+    def street_state(self, community_cards):
+        # BoardState of the current board, built once per street and shared by the decision helpers
+        if self.board_state is None or self.board_state.cards != list(community_cards):
+            self.board_state = BoardState(community_cards)
+        return self.board_state
+
+    def calc_outs(self, hand, community_cards):
+        # Chance in percent of improving the hand by the river, from the exact outs (misc.outs)
+        return find_outs(hand, community_cards, self.street_state(community_cards)).by_river * 100
+
+    def board_texture(self, community_cards):
+        if len(community_cards) < 3: # Pre-flop
+            return "safe"
+        # Safe, flush_draw, straight_draw or dangerous, from the precomputed index (misc.texture)
+        return board_texture(community_cards)
+        
+    def simulate_hand(self, bot_hand, community_cards, num_simulations=DEFAULT_SIMULATIONS, thresholds=()):
+        street = BOARD_STREETS[len(community_cards)]
+        with self.metrics.timer("equity_seconds", street=street):
+            equity, source, trials = self.lookup_equity(bot_hand, community_cards, num_simulations, thresholds)
+        self.metrics.count("equity_requests_total", source=source, street=street)
+        if trials:
+            # Sampled trials score every player's hand; exact enumeration scores the bot once per runout
+            missing = 5 - len(community_cards)
+            if source == "exact":
+                evaluations = trials + comb(50 - len(community_cards), missing)
+            else:
+                evaluations = (self.opponents + 1 if source == "multiway" else 2) * trials
+            self.metrics.count("equity_trials_total", trials, street=street)
+            self.metrics.count("evaluator_calls_total", evaluations, street=street)
+        return equity
+
+    def lookup_equity(self, bot_hand, community_cards, num_simulations, thresholds):
+        # (equity, where it came from, trials run for it)
+        if self.opponents > 1:
+            # Against several random hands; the preflop table, the cache and the range are all heads-up
+            seed = self.rng.getrandbits(64)
+            return multiway_equity(bot_hand, community_cards, self.opponents, num_simulations, seed), "multiway", num_simulations
+
+        if self.opponent_range is not None and self.opponent_range.narrowed:
+            # Depends on the range as well as the cards, so it bypasses the preflop table and the cache
+            if self.exact_threshold and exact_combinations(len(community_cards)) <= self.exact_threshold:
+                return exact_range_equity(bot_hand, community_cards, self.opponent_range), "range_exact", 0
+            seed = self.rng.getrandbits(64)
+            return range_equity(bot_hand, community_cards, self.opponent_range, num_simulations, seed), "range", num_simulations
+
+        if not community_cards and self.preflop_table:
+            equity = preflop_equity(bot_hand)
+            if equity is not None:
+                return equity, "preflop_table", 0
+
+        if self.ponderer is not None:
+            self.ponderer.wait(bot_hand, community_cards)  # The spot may be half computed in the background already
+        equity = self.equity_cache.get(bot_hand, community_cards, num_simulations)
+        if equity is not None:
+            return equity, "cache", 0
+
+        exact = self.exact_threshold and exact_combinations(len(community_cards)) <= self.exact_threshold
+        if not self.adaptive:
+            equity, trials = self.compute_equity(bot_hand, community_cards, num_simulations)
+            return equity, "exact" if exact else "sampled", trials
+        self.last_estimate = adaptive_equity(bot_hand, community_cards, thresholds, max_trials=num_simulations,
+                                             time_budget=self.time_budget, exact_threshold=self.exact_threshold,
+                                             sampling=self.sampling)
+        equity, trials = self.last_estimate.equity, self.last_estimate.trials
+        self.equity_cache.put(bot_hand, community_cards, equity, max(trials, num_simulations) if exact else trials)
+        return equity, "exact" if exact else "adaptive", trials
+
+    def compute_equity(self, bot_hand, community_cards, num_simulations):
+        # Full-size estimate with the bot's settings, cached; also what misc.ponder runs in the background
+        exact = self.exact_threshold and exact_combinations(len(community_cards)) <= self.exact_threshold
+        equity = simulate_equity(bot_hand, community_cards, num_simulations, backend=self.equity_backend, workers=self.workers,
+                                 exact_threshold=self.exact_threshold, sampling=self.sampling)
+        trials = exact_combinations(len(community_cards)) if exact else num_simulations
+        self.equity_cache.put(bot_hand, community_cards, equity, max(trials, num_simulations) if exact else trials)
+        return equity, trials
+
+    def make_decision(self, community_cards, pot, opponent_bet, type):
+        metrics = self.metrics
+        street = BOARD_STREETS[len(community_cards)]
+        start = time.perf_counter()
+        call_amount = opponent_bet - self.current_bet
+        limits = self.thresholds
+        with metrics.timer("decision_stage_seconds", stage="board_texture", street=street):
+            board_type = self.board_texture(community_cards)
+        pot_odds = self.pot_odds(call_amount, pot)
+        with metrics.timer("decision_stage_seconds", stage="simulate_hand", street=street):
+            hand_strength = self.simulate_hand(self.hand, community_cards, num_simulations=self.num_simulations,
+                                               thresholds=(limits["safe_play"], limits["draw_raise"], limits["dangerous_raise"],
+                                                           limits["all_in_call"], pot_odds))
+        ev = self.expected_value(hand_strength, pot, call_amount)
+        with metrics.timer("decision_stage_seconds", stage="calc_outs", street=street):
+            outs = self.calc_outs(self.hand, community_cards)
+
+        if self.think_time:
+            with metrics.timer("decision_stage_seconds", stage="think_time", street=street):
+                time.sleep(self.think_time)
+
+        action = self.choose(type, board_type, hand_strength, ev, pot_odds)
+        metrics.observe("decision_seconds", time.perf_counter() - start, street=street)
+        metrics.count("decisions_total", street=street, action=action)
+        metrics.event("decision", player=self.name, street=street, type=type, board_type=board_type, hand_strength=hand_strength,
+                      ev=ev, pot_odds=pot_odds, outs=outs, action=action)
+        return action
+
+    def choose(self, type, board_type, hand_strength, ev, pot_odds):
+        raise_probability = self.aggressiveness
+        limits = self.thresholds
+
+        if type == 2:  # Being taken all in; call/fold scenario
+            if hand_strength > limits["all_in_call"]:
+                return "call"
+            elif pot_odds > hand_strength and ev > 0:
+                return "call" if self.rng.random() < raise_probability else "fold"
+            else:
+                return "fold"
+        
+        elif type == 3 or type == 1:  # 1: Bets equal: check, raise | 3: General scenario: call, raise, or fold
+            if board_type == "dangerous":
+                if hand_strength > limits["dangerous_raise"] and ev > 0:  # Only raise with stronger hands on dangerous boards
+                    if self.rng.random() < raise_probability:
+                        return "raise"
+                    else:
+                        if type == 1:
+                            return "check"
+                        else:
+                            return "call"
+                else:
+                    if type == 1:
+                        return "check"
+                    else:
+                        return "fold"
+
+            elif board_type == "safe":
+                if hand_strength > limits["safe_play"] or (pot_odds > 0.2 and ev > 0):
+                    if hand_strength > limits["safe_play"] and self.rng.random() < raise_probability:
+                        return "raise"
+                    else:
+                        if type == 1:
+                            return "check"
+                        else:
+                            return "call"
+                else:
+                    if type == 1:
+                        return "check"
+                    else:
+                        return "fold"
+                
+            else:  # Draw-heavy board
+                if hand_strength > limits["draw_raise"] and pot_odds > hand_strength:  # Raise more selectively on draw-heavy boards
+                    if self.rng.random() < raise_probability:
+                        return "raise"
+                    else:
+                        if type == 1:
+                            return "check"
+                        else:
+                            return "call"
+                else:
+                    if type == 1:
+                        return "check"
+                    else:
+                        return "fold"
+
+
+    def bot_raise(self, opponent, community_cards, small_blind):
+        agg = self.aggressiveness
+        strong, moderate = self.thresholds["strong_raise"], self.thresholds["moderate_raise"]
+        with self.metrics.timer("decision_stage_seconds", stage="bot_raise", street=BOARD_STREETS[len(community_cards)]):
+            hand_strength = self.simulate_hand(self.hand, community_cards, num_simulations=self.num_simulations,
+                                               thresholds=(strong - agg, moderate - agg))
+
+        if hand_strength + agg > strong: # Very strong hand
+            base_multiplier = self.rng.randint(3, 5)
+            scaling_factor = (self.rng.randint(15, 20))/10
+        elif hand_strength + agg > moderate:  # Moderate hand
+            base_multiplier = self.rng.randint(1, 3)
+            scaling_factor = (self.rng.randint(10, 15))/10
+        else:  # Weak hand
+            base_multiplier = self.rng.randint(1, 2)
+            scaling_factor = (self.rng.randint(5, 10))/10
+
+        chosen_multiplier = base_multiplier * scaling_factor
+
+        base_raise = round((small_blind * chosen_multiplier),2)
+        br = max(base_raise, 2 * opponent.current_bet)
+        br = min(br, self.chips)  # Ensure the bot doesn’t bet more than it has
+        br = round(br, 1)
+        br = min(round(br * 2) / 2, self.chips)  # Rounding must not take a short stack below zero
+
+        self.bet(br)
+        return br
+
+    def update_range(self, state, opponent):
+        # Narrows the opponent's range with the actions they took since the bot last looked at this hand
+        if state is not self.range_state:
+            self.opponent_range.reset()
+            self.range_state = state
+            self.range_seen = 0
+        for street, player, action, amount in state.actions[self.range_seen:]:
+            if player is opponent:
+                board = state.community_cards[:(0, 3, 4, 5)[street]]
+                self.opponent_range.narrow(action, board, dead=self.hand)
+        self.range_seen = len(state.actions)
+
+    def table_decision(self, community_cards, pot, opponent_bet, type):
+        # Action drawn from the strategy table's mix for this spot, or None if the table has not been built
+        metrics = self.metrics
+        street = BOARD_STREETS[len(community_cards)]
+        start = time.perf_counter()
+        call_amount = opponent_bet - self.current_bet
+        pot_odds = self.pot_odds(call_amount, pot) if call_amount > 0 else 0.0
+        board_type = self.board_texture(community_cards)
+        strength = hand_strength(self.hand, community_cards)
+        moves = policy(BOARD_SIZES.index(len(community_cards)), board_type, pot_odds, type, strength)
+        if moves is None:
+            return None
+        move = choose_move(moves, self.rng)
+        self.raise_size = RAISE_SIZES.get(move)
+        action = "raise" if self.raise_size is not None else move
+
+        metrics.observe("decision_seconds", time.perf_counter() - start, street=street)
+        metrics.count("decisions_total", street=street, action=action)
+        metrics.event("decision", player=self.name, street=street, type=type, board_type=board_type,
+                      hand_strength=strength, pot_odds=pot_odds, move=move, action=action)
+        return action
+
+    def table_raise(self, opponent, pot):
+        # Chips for the table's raise size: the call plus that share of the pot after calling
+        call_amount = opponent.current_bet - self.current_bet
+        br = max(call_amount + self.raise_size * (pot + call_amount), 2 * opponent.current_bet)
+        br = min(br, self.chips)
+        br = min(round(br * 2) / 2, self.chips)
+        self.raise_size = None
+        self.bet(br)
+        return br
+
+    def search_decision(self, state, opponent, type):
+        # Move with the most playouts in a tree search of the rest of the hand, for a heads-up Table
+        metrics = self.metrics
+        street = BOARD_STREETS[len(state.community_cards)]
+        start = time.perf_counter()
+        this_street = [player for number, player, _, _ in state.actions if number == state.street]
+        root = SearchState([self.chips, opponent.chips], [self.current_bet, opponent.current_bet], state.pot,
+                           state.street, 0, 0 if state.first_actor is self else 1,
+                           [self in this_street, opponent in this_street])
+        villain_range = self.opponent_range if self.opponent_range is not None and self.opponent_range.narrowed else None
+        allowed = [move for move in ("fold", "check", "call", *SEARCH_RAISES)
+                   if (move if move not in SEARCH_RAISES else "raise") in ACTIONS[type]]
+        with metrics.timer("decision_stage_seconds", stage="search", street=street):
+            result = search(root, self.hand, state.community_cards, self.rng, self.search_time,
+                            villain_range=villain_range, root_moves=allowed)
+        self.last_search = result
+        self.search_amount = result.amount
+        action = "raise" if result.amount is not None else result.move
+
+        metrics.observe("decision_seconds", time.perf_counter() - start, street=street)
+        metrics.count("search_playouts_total", result.playouts, street=street)
+        metrics.count("search_nodes_total", result.nodes, street=street)
+        metrics.count("decisions_total", street=street, action=action)
+        metrics.event("decision", player=self.name, street=street, type=type, move=result.move, action=action,
+                      playouts=result.playouts, nodes=result.nodes, values=result.values)
+        return action
+
+    def choose_action(self, state, opponent, type):
+        self.opponents = max(sum(not player.folded for player in state.players) - 1, 1)
+        if self.opponent_range is not None:
+            self.update_range(state, opponent)
+        if self.search_time and self.opponents == 1 and hasattr(state, "first_actor"):
+            return self.search_decision(state, opponent, type)
+        if self.strategy:
+            action = self.table_decision(state.community_cards, state.pot, opponent.current_bet, type)
+            if action is not None:
+                return action
+        return self.make_decision(state.community_cards, state.pot, opponent.current_bet, type)
+
+    def choose_raise(self, state, opponent):
+        if self.search_amount is not None:
+            br = min(round(self.search_amount * 2) / 2, self.chips)
+            self.search_amount = None
+            self.bet(br)
+            return br
+        if self.raise_size is not None:
+            return self.table_raise(opponent, state.pot)
+        return self.bot_raise(opponent, state.community_cards, state.small_blind)
+
+class RandomPlayer(Player):
+    # Picks uniformly among the legal actions and makes minimum raises; a cheap opponent for self-play
+    def __init__(self, name, chips, seed=None):
+        super().__init__(name, chips)
+        self.rng = random.Random(seed)
+
+    def choose_action(self, state, opponent, type):
+        return self.rng.choice(ACTIONS[type])
+
+    def choose_raise(self, state, opponent):
+        amount = min(max(2 * opponent.current_bet, state.big_blind), self.chips)
+        self.bet(amount)
+        return amount
@@ -0,0 +1,97 @@
+# Background "pondering" for an AIPlayer: while the opponent thinks, a daemon thread computes the bot's equity for
+# the spot it will face and for every card the next street can bring, straight into the bot's equity cache. The
+# estimates are the same size as the bot's own (compute_equity), so decisions are unchanged, only ready sooner.
+#
+#   ponderer = Ponderer(bot)
+#   table.add_listener(ponderer)
+import threading
+from collections import deque
+from misc.deck import CARDS
+from misc.equity_cache import canonical_key
+from misc.player import BOARD_STREETS
+from misc.preflop import preflop_equity
+
+
+class Ponderer:
+    # Table listener: a new hand or a new board replaces the queued work, so stale spots are dropped
+    def __init__(self, bot, next_street=True):
+        self.bot = bot
+        self.next_street = next_street  # Also ponder each possible turn (on the flop) or river (on the turn)
+        self.queue = deque()
+        self.current = None  # Canonical key of the spot being computed
+        self.condition = threading.Condition()
+        self.stopped = False
+        bot.ponderer = self
+        self.thread = threading.Thread(target=self.run, name=f"ponder-{bot.name}", daemon=True)
+        self.thread.start()
+
+    def __call__(self, event, state, **details):
+        if event in ("blinds", "deal"):
+            self.ponder(self.bot.hand, state.community_cards)
+        elif event == "hand_end":
+            self.cancel()
+
+    def spots(self, hand, board):
+        # The current spot first, then the next street's, one per suit-isomorphic class
+        spots = []
+        if board or not (self.bot.preflop_table and preflop_equity(hand) is not None):
+            spots.append((list(hand), list(board)))
+        if self.next_street and 3 <= len(board) < 5:
+            dead = set(hand) | set(board)
+            seen = {canonical_key(hand, board)}
+            for card in CARDS:
+                if card in dead:
+                    continue
+                key = canonical_key(hand, board + [card])
+                if key not in seen:
+                    seen.add(key)
+                    spots.append((list(hand), board + [card]))
+        return spots
+
+    def ponder(self, hand, board):
+        spots = self.spots(hand, list(board))
+        with self.condition:
+            self.queue.clear()
+            self.queue.extend(spots)
+            self.condition.notify_all()
+
+    def cancel(self):
+        with self.condition:
+            self.queue.clear()
+
+    def wait(self, hand, board):
+        # Called by the bot before it computes a spot itself: if the thread is on that spot, take its result instead
+        key = canonical_key(hand, board)
+        with self.condition:
+            while self.current == key:
+                self.condition.wait()
+
+    def run(self):
+        bot = self.bot
+        while True:
+            with self.condition:
+                while not self.queue and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                hand, board = self.queue.popleft()
+                if bot.equity_cache.contains(hand, board, bot.num_simulations):
+                    continue
+                self.current = canonical_key(hand, board)
+            try:
+                street = BOARD_STREETS[len(board)]
+                with bot.metrics.timer("ponder_seconds", street=street):
+                    bot.compute_equity(hand, board, bot.num_simulations)
+                bot.metrics.count("pondered_spots_total", street=street)
+            finally:
+                with self.condition:
+                    self.current = None
+                    self.condition.notify_all()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.queue.clear()
+            self.condition.notify_all()
+        self.thread.join()
+        self.bot.ponderer = None
@@ -0,0 +1,178 @@
+# Heads-up preflop equity for the 169 starting-hand classes, precomputed into data/preflop_equity.bin.
+# Build (resumable, parallel): python -m misc.preflop [--trials N] [--workers N] [--matrix]
+import argparse
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from misc.deck import CARDS, RANK_OF, SUIT_OF
+from misc.equity import counts, make_rng, matchup_counts, np, showdown_counts, worker_seeds
+
+NUM_CLASSES = 169
+CLASS_CHARS = "23456789TJQKA"
+TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "preflop_equity.bin")
+# magic, version, class count, trials per class, 1 if the 169x169 matrix follows the equities
+HEADER = struct.Struct("<4sHHIB3x")
+MAGIC = b"PFEQ"
+VERSION = 1
+
+_table = None  # float32 view of the mapped file, loaded on first use
+_load_failed = False
+
+
+def hand_class(hand):
+    # Pairs on the diagonal of a 13x13 grid, suited hands below it and offsuit hands above it
+    high, low = max(RANK_OF[hand[0]], RANK_OF[hand[1]]), min(RANK_OF[hand[0]], RANK_OF[hand[1]])
+    if SUIT_OF[hand[0]] == SUIT_OF[hand[1]]:
+        return high * 13 + low
+    return low * 13 + high
+
+
+def class_name(index):
+    row, col = divmod(index, 13)
+    if row == col:
+        return CLASS_CHARS[row] * 2
+    if row > col:
+        return f"{CLASS_CHARS[row]}{CLASS_CHARS[col]}s"
+    return f"{CLASS_CHARS[col]}{CLASS_CHARS[row]}o"
+
+
+def class_combos(index):
+    row, col = divmod(index, 13)
+    high, low = max(row, col), min(row, col)
+    suited = row > col
+    combos = []
+    for first in range(4):
+        for second in range(4):
+            if (first == second) != suited or (high == low and second <= first):
+                continue
+            combos.append([CARDS[high * 4 + first], CARDS[low * 4 + second]])
+    return combos
+
+
+def load_table(path=TABLE_PATH):
+    global _table, _load_failed
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        _load_failed = True
+        return None
+    magic, version, num_classes, _, _ = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or num_classes != NUM_CLASSES:
+        _load_failed = True
+        return None
+    _table = memoryview(mapped)[HEADER.size:].cast("f")
+    return _table
+
+
+def has_matrix():
+    return _table is not None and len(_table) >= NUM_CLASSES + NUM_CLASSES * NUM_CLASSES
+
+
+def preflop_equity(hand):
+    # Equity of a starting hand against one random hand, or None if the table has not been built
+    if _table is None and (_load_failed or load_table() is None):
+        return None
+    return _table[hand_class(hand)]
+
+
+def preflop_matchup(hand, villain_hand):
+    # Class-vs-class equity from the optional matrix, or None if it was not built
+    if preflop_equity(hand) is None or not has_matrix():
+        return None
+    return _table[NUM_CLASSES + hand_class(hand) * NUM_CLASSES + hand_class(villain_hand)]
+
+
+def _class_task(index, trials, stream):
+    wins, ties = counts(class_combos(index)[0], [], trials, stream)
+    return index, (wins + 0.5 * ties) / trials
+
+
+def _matchup_task(index, other, trials, stream):
+    # Each trial deals a random non-overlapping pair of concrete hands from the two classes
+    rng = make_rng(stream)
+    pairs = [(a, b) for a in class_combos(index) for b in class_combos(other) if not set(a) & set(b)]
+    if np is not None:
+        chosen = np.array([a + b for a, b in pairs])[rng.integers(0, len(pairs), size=trials)]
+        wins, ties = showdown_counts(chosen[:, :2], chosen[:, 2:], [], rng)
+        return (index, other), (wins + 0.5 * ties) / trials
+
+    share = max(1, trials // len(pairs))
+    wins = ties = 0
+    for hero, villain in pairs:
+        pair_wins, pair_ties = matchup_counts(hero, villain, [], share, rng)
+        wins += pair_wins
+        ties += pair_ties
+    return (index, other), (wins + 0.5 * ties) / (share * len(pairs))
+
+
+def _read_progress(path):
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                key, _, value = line.rpartition(" ")
+                if key:  # Skip a line cut short by an interruption
+                    done[key] = float(value)
+    return done
+
+
+def _run(tasks, workers, progress, done):
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(progress, "a") as log:
+        futures = [pool.submit(*task) for task in tasks]
+        for count, future in enumerate(as_completed(futures), 1):
+            key, equity = future.result()
+            key = " ".join(map(str, key)) if isinstance(key, tuple) else str(key)
+            done[key] = equity
+            log.write(f"{key} {equity!r}\n")
+            log.flush()
+            if count % 10 == 0 or count == len(futures):
+                print(f"{count}/{len(futures)} done")
+
+
+def build_table(path=TABLE_PATH, trials=1000000, workers=None, seed=0, matrix=False, matrix_trials=20000):
+    # Finished results are appended to <path>.partial, so an interrupted build picks up where it stopped.
+    # Every class and matchup has its own seed stream, so results do not depend on order or worker count.
+    progress = path + ".partial"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    done = _read_progress(progress)
+    streams = worker_seeds(seed, NUM_CLASSES + NUM_CLASSES * NUM_CLASSES)
+
+    tasks = [(_class_task, i, trials, streams[i]) for i in range(NUM_CLASSES) if str(i) not in done]
+    if matrix:
+        tasks += [(_matchup_task, i, j, matrix_trials, streams[NUM_CLASSES + i * NUM_CLASSES + j])
+                  for i in range(NUM_CLASSES) for j in range(i + 1, NUM_CLASSES) if f"{i} {j}" not in done]
+    _run(tasks, workers, progress, done)
+
+    values = [done[str(i)] for i in range(NUM_CLASSES)]
+    if matrix:
+        for i in range(NUM_CLASSES):
+            for j in range(NUM_CLASSES):
+                if i == j:
+                    values.append(0.5)  # A class against itself splits evenly by symmetry
+                elif i < j:
+                    values.append(done[f"{i} {j}"])
+                else:
+                    values.append(1 - done[f"{j} {i}"])
+
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, NUM_CLASSES, trials, int(matrix)))
+        f.write(struct.pack(f"<{len(values)}f", *values))
+    os.replace(path + ".tmp", path)
+    os.remove(progress)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=TABLE_PATH)
+    parser.add_argument("--trials", type=int, default=1000000, help="trials per starting-hand class")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--matrix", action="store_true", help="also build the 169x169 class-vs-class matrix")
+    parser.add_argument("--matrix-trials", type=int, default=20000, help="trials per matrix cell")
+    args = parser.parse_args()
+    build_table(args.output, args.trials, args.workers, args.seed, args.matrix, args.matrix_trials)
+    load_table(args.output)
+    for index in sorted(range(NUM_CLASSES), key=lambda i: -_table[i])[:5]:
+        print(f"{class_name(index)}: {_table[index]:.4f}")
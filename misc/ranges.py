@@ -0,0 +1,242 @@
+# Opponent ranges: a weight for each of the 1326 two-card combos, narrowed by the actions the opponent takes and
+# sampled in O(1) per draw from an alias table. Cards that turn out to be dead (the bot's hand, the board) are
+# rejected at draw time, so dealing never forces the table to be rebuilt; only a change of weights does, lazily,
+# at the next draw.
+import random
+from collections import Counter
+from itertools import combinations
+from misc.deck import CARDS, Dealer
+from misc.equity import live_cards, pair_indices, sample_excluding
+from misc.hand_evaluator import BoardState, HandEvaluator, np
+from misc.preflop import preflop_equity
+
+NUM_COMBOS = 1326
+COMBOS = [(CARDS[a], CARDS[b]) for a, b in combinations(range(52), 2)]
+COMBO_MASKS = [1 << a | 1 << b for a, b in COMBOS]
+COMBO_INDEX = {}  # (card, card) in either order -> index into COMBOS
+for _index, (_a, _b) in enumerate(COMBOS):
+    COMBO_INDEX[_a, _b] = COMBO_INDEX[_b, _a] = _index
+if np is not None:
+    COMBO_ARRAY = np.array(COMBOS, dtype=np.int64)
+
+# How likely each action is for a combo of strength s (its percentile among the opponent's possible hands, 0-1):
+# floor + (1 - floor) * s ** power, or with (1 - s) for actions that weak hands take more often
+ACTION_LIKELIHOODS = {
+    "raise": (0.05, 3.0, "strong"),
+    "call": (0.25, 1.0, "strong"),
+    "check": (0.6, 2.0, "weak"),
+}
+
+
+def card_mask(cards):
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+
+def percentiles(strengths):
+    # Share of the other values each one beats, counting ties as half
+    if np is not None:
+        strengths = np.asarray(strengths)
+        ordered = np.sort(strengths)
+        below = np.searchsorted(ordered, strengths, "left")
+        equal = np.searchsorted(ordered, strengths, "right") - below
+        return ((below + 0.5 * (equal - 1)) / max(len(strengths) - 1, 1)).tolist()
+    counts = Counter(strengths)
+    below = {}
+    seen = 0
+    for value in sorted(counts):
+        below[value] = seen
+        seen += counts[value]
+    return [(below[value] + 0.5 * (counts[value] - 1)) / max(len(strengths) - 1, 1) for value in strengths]
+
+
+def combo_strengths(board, dead=()):
+    # Percentile strength of every combo on this board, 0 for combos that cannot be held; preflop it ranks the
+    # combos by their preflop equity when data/preflop_equity.bin is there, else by a simple high-card score
+    dead_mask = card_mask(board) | card_mask(dead)
+    live = [i for i in range(NUM_COMBOS) if not COMBO_MASKS[i] & dead_mask]
+    if not board:
+        scores = [preflop_score(COMBOS[i]) for i in live]
+    elif np is not None:
+        cards = np.array([COMBOS[i] for i in live], dtype=np.int64)
+        scores = HandEvaluator.evaluate_batch(np.hstack([cards, np.broadcast_to(np.array(board), (len(live), len(board)))]))
+    else:
+        scores = [HandEvaluator.evaluate(list(COMBOS[i]) + list(board)) for i in live]
+    strengths = [0.0] * NUM_COMBOS
+    for i, strength in zip(live, percentiles(scores)):
+        strengths[i] = strength
+    return strengths
+
+
+def preflop_score(hand):
+    equity = preflop_equity(hand)
+    if equity is not None:
+        return equity
+    high, low = sorted((card >> 2 for card in hand), reverse=True)
+    return (high == low) * 100 + high * 8 + low + (hand[0] & 3 == hand[1] & 3) * 4
+
+
+class Range:
+    def __init__(self, weights=None):
+        self.weights = list(weights) if weights is not None else [1.0] * NUM_COMBOS
+        self.narrowed = weights is not None  # False while every combo is still equally likely
+        self.alias = None  # (probabilities, aliases), rebuilt on the first draw after the weights change
+
+    def reset(self):
+        self.weights = [1.0] * NUM_COMBOS
+        self.narrowed = False
+        self.alias = None
+
+    def copy(self):
+        copy = Range(self.weights)
+        copy.narrowed = self.narrowed
+        return copy
+
+    def weight(self, hand):
+        return self.weights[COMBO_INDEX[tuple(hand)]]
+
+    def narrow(self, action, board, dead=(), likelihoods=ACTION_LIKELIHOODS):
+        # Bayesian update for an action seen on this board; folds and unknown actions leave the range alone
+        if action not in likelihoods:
+            return
+        floor, power, favours = likelihoods[action]
+        strengths = combo_strengths(board, dead)
+        weights = self.weights
+        for i, strength in enumerate(strengths):
+            if favours == "weak":
+                strength = 1.0 - strength
+            weights[i] *= floor + (1.0 - floor) * strength ** power
+        self.normalize()
+        self.narrowed = True
+        self.alias = None
+
+    def normalize(self):
+        total = sum(self.weights)
+        if total > 0:
+            self.weights = [w * NUM_COMBOS / total for w in self.weights]
+
+    def live(self, dead_cards):
+        # (combo index, weight) for the combos that avoid dead_cards and have weight left
+        dead_mask = card_mask(dead_cards)
+        return [(i, w) for i, w in enumerate(self.weights) if w > 0 and not COMBO_MASKS[i] & dead_mask]
+
+    def build_alias(self):
+        # Vose's alias method: each slot holds its own combo with probability prob[i], else combo alias[i]
+        total = sum(self.weights)
+        if total <= 0:
+            raise ValueError("range has no combos left")
+        scaled = [w * NUM_COMBOS / total for w in self.weights]
+        prob = [0.0] * NUM_COMBOS
+        alias = list(range(NUM_COMBOS))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        for i in small + large:
+            prob[i] = 1.0
+        if np is not None:
+            self.alias = (np.array(prob), np.array(alias, dtype=np.int64))
+        else:
+            self.alias = (prob, alias)
+        return self.alias
+
+    def sample(self, rng, dead_cards=()):
+        # One combo index that avoids dead_cards: an alias draw, redrawn on a collision. rng is a random.Random
+        prob, alias = self.alias or self.build_alias()
+        dead_mask = card_mask(dead_cards)
+        for attempt in range(1, 1 << 30):
+            slot = rng.randrange(NUM_COMBOS)
+            index = slot if rng.random() < prob[slot] else alias[slot]
+            if not COMBO_MASKS[index] & dead_mask:
+                return index
+            if attempt % 1000 == 0 and not self.live(dead_cards):
+                raise ValueError("range has no combos left that avoid the dead cards")
+
+    def sample_batch(self, size, rng, dead_cards=()):
+        # (size, 2) array of hands that avoid dead_cards. rng is a numpy Generator
+        prob, alias = self.alias or self.build_alias()
+        dead_mask = card_mask(dead_cards)
+        if not self.live(dead_cards):
+            raise ValueError("range has no combos left that avoid the dead cards")
+        blocked = np.array([bool(m & dead_mask) for m in COMBO_MASKS])
+        indices = np.empty(size, dtype=np.int64)
+        todo = np.arange(size)
+        while len(todo):
+            slots = rng.integers(0, NUM_COMBOS, len(todo))
+            drawn = np.where(rng.random(len(todo)) < prob[slots], slots, alias[slots])
+            indices[todo] = drawn
+            todo = todo[blocked[drawn]]
+        return COMBO_ARRAY[indices]
+
+
+def range_equity(hero_hand, community_cards, villain_range, trials, seed=None):
+    # Share of pots won against a hand drawn from villain_range, by weighted sampling
+    hero_hand, community_cards = list(hero_hand), list(community_cards)
+    known = len(community_cards)
+    missing = 5 - known
+    dead = hero_hand + community_cards
+    if np is None:
+        rng = random.Random(seed)
+        dealer = Dealer(dead, rng)
+        board_state = BoardState(community_cards)
+        hero_state = board_state.add(hero_hand)
+        drawn, runout = [0] * (2 + missing), [0] * missing  # The opponent's hand then the runout, and the runout alone
+        score = 0.0
+        for _ in range(trials):
+            index = villain_range.sample(rng, dead)
+            drawn[0], drawn[1] = COMBOS[index]
+            dealer.deal_into(drawn, runout, COMBO_MASKS[index], 2)  # Runout around the opponent's cards
+            hero = hero_state.evaluate(runout)
+            other = board_state.evaluate(drawn)
+            score += 1.0 if hero > other else 0.5 if hero == other else 0.0
+        return score / trials
+
+    rng = np.random.default_rng(seed)
+    villain = villain_range.sample_batch(trials, rng, dead)
+    board = np.empty((trials, 5), dtype=np.int64)
+    board[:, :known] = community_cards
+    if missing:
+        taken = np.hstack([villain, np.broadcast_to(np.array(dead), (trials, len(dead)))])
+        board[:, known:] = sample_excluding(taken, missing, rng)
+    hero = HandEvaluator.evaluate_batch(np.hstack([np.broadcast_to(np.array(hero_hand), (trials, 2)), board]))
+    other = HandEvaluator.evaluate_batch(np.hstack([villain, board]))
+    return float(((hero > other).sum() + 0.5 * (hero == other).sum()) / trials)
+
+
+def exact_range_equity(hero_hand, community_cards, villain_range):
+    # The same equity by enumerating every runout and every opponent combo, each weighted by the range.
+    # Every combo meets the same number of runouts, so weighting the showdowns weights the combos.
+    hero_hand, community_cards = list(hero_hand), list(community_cards)
+    live = live_cards(hero_hand + community_cards)
+    missing = 5 - len(community_cards)
+    weights = villain_range.weights
+    if np is not None:
+        matrix = np.zeros((52, 52))
+        for (a, b), w in zip(COMBOS, weights):
+            matrix[a, b] = matrix[b, a] = w
+    score = total = 0.0
+    for runout in combinations(live, missing):
+        board = community_cards + list(runout)
+        rest = [card for card in live if card not in runout]
+        hero = HandEvaluator.evaluate(hero_hand + board)
+        if np is not None:
+            pairs = np.array(rest)[pair_indices(len(rest))]
+            w = matrix[pairs[:, 0], pairs[:, 1]]
+            villain = HandEvaluator.evaluate_batch(np.hstack([pairs, np.broadcast_to(np.array(board), (len(pairs), 5))]))
+            score += float(w[hero > villain].sum() + 0.5 * w[hero == villain].sum())
+            total += float(w.sum())
+        else:
+            for pair in combinations(rest, 2):
+                w = weights[COMBO_INDEX[pair]]
+                villain = HandEvaluator.evaluate(list(pair) + board)
+                score += w if hero > villain else 0.5 * w if hero == villain else 0.0
+                total += w
+    if total <= 0:
+        raise ValueError("range has no combos left that avoid the dead cards")
+    return score / total
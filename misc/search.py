@@ -0,0 +1,253 @@
+# Monte Carlo tree search over the rest of a heads-up hand, for AIPlayer(search_time=...). Each playout deals the
+# opponent a hand (from the bot's opponent range when it has one) and the rest of the board, so the statistics
+# average over the cards the bot cannot see. Tree nodes are public betting histories; at each node the move
+# statistics are kept per hand class of the player to act, on the board they can see, so a player's choices
+# depend on the betting and their own cards but never on the other player's. Lines that reach a showdown are scored straight from the dealt cards, with no further random play.
+#
+# SearchState is the hand reduced to what the betting needs, in __slots__ and small lists, so a playout copies it
+# in a few attribute assignments instead of cloning Player objects.
+import math
+import random
+import time
+from misc.deck import RANK_OF, Dealer
+from misc.hand_evaluator import CATEGORY_SHIFT, BoardState
+from misc.ranges import COMBO_MASKS, COMBOS
+
+BOARD_SIZES = (0, 3, 4, 5)  # Community cards on each street
+
+RAISE_SIZES = {"raise_half": 0.5, "raise_pot": 1.0}  # Raise beyond the call, as a share of the pot after calling
+MAX_RAISES = 3  # Raises per street the tree considers
+EXPLORATION = 1.4
+SEARCH_TIME = 0.05  # Seconds per decision
+MIN_PLAYOUTS = 200  # Played even if the time budget runs out first
+
+
+class SearchState:
+    # Seat 0 is the searching player, seat 1 the opponent
+    __slots__ = ("stacks", "bets", "pot", "street", "to_act", "first", "acted", "raises", "winner", "showdown")
+
+    def __init__(self, stacks, bets, pot, street, to_act, first, acted):
+        self.stacks = stacks  # Chips behind
+        self.bets = bets  # Chips put in on this street
+        self.pot = pot  # Everything in the middle, this street's bets included
+        self.street = street  # 0 preflop to 3 river
+        self.to_act = to_act
+        self.first = first  # Seat that acts first after the flop
+        self.acted = acted  # Whether each seat has acted on this street
+        self.raises = 0
+        self.winner = None  # Seat that took the pot when the other folded
+        self.showdown = False
+
+    def clone(self):
+        state = SearchState.__new__(SearchState)
+        state.stacks = self.stacks[:]
+        state.bets = self.bets[:]
+        state.pot = self.pot
+        state.street = self.street
+        state.to_act = self.to_act
+        state.first = self.first
+        state.acted = self.acted[:]
+        state.raises = self.raises
+        state.winner = self.winner
+        state.showdown = self.showdown
+        return state
+
+    def done(self):
+        return self.winner is not None or self.showdown
+
+    def moves(self):
+        seat = self.to_act
+        to_call = self.bets[1 - seat] - self.bets[seat]
+        can_raise = self.raises < MAX_RAISES and self.stacks[seat] > to_call and self.stacks[1 - seat] > 0
+        if to_call <= 0:
+            return ("check", "raise_half", "raise_pot") if can_raise else ("check",)
+        return ("fold", "call", "raise_half", "raise_pot") if can_raise else ("fold", "call")
+
+    def raise_amount(self, move):
+        # Chips the player to act adds: the engine's minimum of twice the opponent's bet, at most what either
+        # player has behind
+        seat = self.to_act
+        to_call = self.bets[1 - seat] - self.bets[seat]
+        amount = max(to_call + RAISE_SIZES[move] * (self.pot + to_call), 2 * self.bets[1 - seat])
+        return min(amount, self.stacks[seat], to_call + self.stacks[1 - seat])
+
+    def play(self, move, amount=None):
+        seat = self.to_act
+        if move == "fold":
+            self.winner = 1 - seat
+            return
+        if move == "call":
+            to_call = self.bets[1 - seat] - self.bets[seat]
+            amount = min(to_call, self.stacks[seat])
+            if amount < to_call:  # All in for less: the part of the bet that cannot be called goes back
+                self.stacks[1 - seat] += to_call - amount
+                self.bets[1 - seat] -= to_call - amount
+                self.pot -= to_call - amount
+        elif move != "check":
+            amount = self.raise_amount(move) if amount is None else amount
+            self.raises += 1
+            self.acted[1 - seat] = False
+        else:
+            amount = 0
+        self.stacks[seat] -= amount
+        self.bets[seat] += amount
+        self.pot += amount
+        self.acted[seat] = True
+        self.to_act = 1 - seat
+        if self.acted[1 - seat] and self.bets[0] == self.bets[1]:
+            self.next_street()
+        elif self.stacks[self.to_act] <= 0 and self.bets[0] == self.bets[1]:
+            self.next_street()
+
+    def next_street(self):
+        if self.street == 3 or self.stacks[0] <= 0 or self.stacks[1] <= 0:
+            self.showdown = True  # River over, or someone is all in and the rest of the board just runs out
+            return
+        self.street += 1
+        self.bets = [0, 0]
+        self.acted = [False, False]
+        self.raises = 0
+        self.to_act = self.first
+
+    def payoff(self, start_stack, result):
+        # Seat 0's chips won or lost since start_stack; result is 1, 0.5 or 0 for seat 0 at showdown
+        if self.winner is not None:
+            share = 1.0 if self.winner == 0 else 0.0
+        else:
+            share = result
+        return self.stacks[0] + share * self.pot - start_stack
+
+
+class Node:
+    # One public betting history, shared by every deal that reaches it. What the player to act knows differs
+    # between playouts (the class of their hand on the board they can see), so untried moves, visits and move
+    # statistics are kept per class; the children, like the history, are not.
+    __slots__ = ("seat", "street", "legal", "untried", "visits", "children", "stats")
+
+    def __init__(self, state):
+        self.seat = state.to_act
+        self.street = state.street
+        self.legal = state.moves() if not state.done() else ()
+        self.untried = {}  # Class -> moves not tried yet with that class
+        self.visits = {}  # Class -> playouts through this node with that class
+        self.children = {}  # Move -> Node
+        self.stats = {}  # (class, move) -> [playouts, sum of seat 0's normalised payoffs]
+
+    def select(self, info):
+        # UCT from the point of view of the seat to act
+        log_visits = math.log(self.visits[info])
+        sign = 1.0 if self.seat == 0 else -1.0
+        best, best_score = None, -math.inf
+        for move in self.legal:
+            count, total = self.stats[info, move]
+            score = sign * total / count + EXPLORATION * math.sqrt(log_visits / count)
+            if score > best_score:
+                best, best_score = move, score
+        return best
+
+
+def hand_class(strength):
+    # High card, one pair, two pair, or better
+    return min(strength >> CATEGORY_SHIFT, 3)
+
+
+class SearchResult:
+    __slots__ = ("move", "amount", "playouts", "nodes", "seconds", "visits", "values")
+
+    def __init__(self, move, amount, playouts, nodes, seconds, visits, values):
+        self.move = move
+        self.amount = amount  # Chips for a raise
+        self.playouts = playouts
+        self.nodes = nodes
+        self.seconds = seconds
+        self.visits = visits  # {move: visits} at the root
+        self.values = values  # {move: mean payoff in chips} at the root
+
+
+def search(root, hand, community_cards, rng=None, time_budget=SEARCH_TIME, max_playouts=None, villain_range=None,
+           min_playouts=MIN_PLAYOUTS, root_moves=None):
+    # Best move for seat 0 at root. hand and community_cards are seat 0's cards and the board so far; rng is a
+    # random.Random. Runs until time_budget seconds have passed (after at least min_playouts) or max_playouts.
+    # root_moves limits the first move, e.g. to what the engine allows.
+    rng = rng or random.Random()
+    hand, community_cards = list(hand), list(community_cards)
+    board_state = BoardState(community_cards)
+    hero_state = board_state.add(hand)
+    dead = hand + community_cards
+    dealer = Dealer(dead, rng)
+    missing = 5 - len(community_cards)
+    known = len(community_cards)
+    drawn, runout = [0] * (2 + missing), [0] * missing  # The opponent's hand then the runout, and the runout alone
+    hero_preflop = int(RANK_OF[hand[0]] == RANK_OF[hand[1]])  # Preflop classes: paired or not
+    start_stack = root.stacks[0]
+    scale = root.pot  # Payoffs in pots, so exploration is weighed against the money at stake
+    tree = Node(root)
+    if root_moves is not None:
+        tree.legal = tuple(move for move in tree.legal if move in root_moves)
+    nodes = 1
+    playouts = 0
+    start = time.perf_counter()
+    deadline = start + time_budget if time_budget else None
+    streets = range(root.street, 4)
+    while max_playouts is None or playouts < max_playouts:
+        if deadline is not None and playouts >= min_playouts and not playouts % 16 and time.perf_counter() >= deadline:
+            break
+        # Deal the hidden cards for this playout, and each player's hand class on every street still to come
+        if villain_range is not None:
+            index = villain_range.sample(rng, dead)
+            drawn[0], drawn[1] = COMBOS[index]
+            dealer.deal_into(drawn, runout, COMBO_MASKS[index], 2)
+        else:
+            dealer.deal_into(drawn, runout)
+        classes = ({0: hero_preflop}, {0: int(RANK_OF[drawn[0]] == RANK_OF[drawn[1]])})
+        for street in streets:
+            if street:
+                seen = BOARD_SIZES[street] - known
+                classes[0][street] = hand_class(hero_state.evaluate(runout[:seen]))
+                classes[1][street] = hand_class(board_state.evaluate(drawn[:2 + seen]))
+        hero = hero_state.evaluate(runout)
+        other = board_state.evaluate(drawn)
+        result = 1.0 if hero > other else 0.5 if hero == other else 0.0
+
+        state = root.clone()
+        node = tree
+        path = []  # (node, class, move) for every move played in the tree
+        while not state.done():
+            info = classes[node.seat][node.street]
+            untried = node.untried.get(info)
+            if untried is None:
+                untried = node.untried[info] = list(node.legal)
+            node.visits[info] = node.visits.get(info, 0) + 1
+            if untried:
+                move = untried.pop(rng.randrange(len(untried)))
+                state.play(move)
+                path.append((node, info, move))
+                if move not in node.children:
+                    node.children[move] = Node(state)
+                    nodes += 1
+                break
+            move = node.select(info)
+            state.play(move)
+            path.append((node, info, move))
+            node = node.children[move]
+        # Past the first move tried, the hand is checked and called down
+        while not state.done():
+            state.play("check" if "check" in state.moves() else "call")
+
+        reward = state.payoff(start_stack, result) / scale
+        for visited, info, move in path:
+            stat = visited.stats.get((info, move))
+            if stat is None:
+                visited.stats[info, move] = [1, reward]
+            else:
+                stat[0] += 1
+                stat[1] += reward
+        playouts += 1
+
+    info = classes[0][root.street] if playouts else None
+    stats = {move: tree.stats[info, move] for move in tree.legal if (info, move) in tree.stats}
+    visits = {move: count for move, (count, _) in stats.items()}
+    values = {move: total / count * scale for move, (count, total) in stats.items()}
+    move = max(visits, key=visits.get)
+    amount = root.raise_amount(move) if move in RAISE_SIZES else None
+    return SearchResult(move, amount, playouts, nodes, time.perf_counter() - start, visits, values)
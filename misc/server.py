@@ -0,0 +1,276 @@
+# Asyncio server hosting many concurrent heads-up tables, one remote player against an AIPlayer per connection.
+# The event loop only does socket I/O; each table plays its hands with misc.engine.Table in a thread of an
+# executor, so the bot's equity work never blocks the loop or other tables, and the remote player's moves are
+# handed from the loop to the table thread.
+#
+# The protocol is JSON lines over TCP or a Unix socket. Client -> server:
+#   {"type": "join", "name": "Alice", "buyin": 1000, "aggressiveness": 0.5}   start a game (again after game_over)
+#   {"type": "action", "action": "call"}   one of the options in the last "act"; a raise also sends "amount"
+#                                          (a number, or "all in")
+#   {"type": "quit"}
+# Server -> client: "welcome", then per hand "hand_start" (with the player's hole cards), "blinds", "deal",
+# "action", "act" (the player's turn), "result" (showdown cards when there is one) and "hand_end"; "game_over"
+# when someone busts, and "error" for a rejected message. Cards are written as in text hand histories ("Ah", "Td").
+#
+#   python -m misc.server --port 7777            (or --unix /tmp/poker.sock)
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from misc.engine import STREETS, Table
+from misc.hand_evaluator import build_array_tables, build_tables, np
+from misc.history import card_text
+from misc.instrumentation import Metrics
+from misc.player import ACTIONS, AIPlayer, Player
+
+MAX_TABLES = 64
+BOT_CONFIG = {"num_simulations": 2000}  # Keyword arguments for every table's AIPlayer; join messages may override
+JOIN_OPTIONS = ("aggressiveness",)
+
+
+class Disconnected(Exception):
+    pass
+
+
+def cards_json(cards):
+    return [card_text(card) for card in cards]
+
+
+class RemotePlayer(Player):
+    # A seat played over a connection: choose_action blocks the table thread until the session hands over a move
+    def __init__(self, name, chips, session):
+        super().__init__(name, chips)
+        self.session = session
+        self.raise_amount = None
+
+    def choose_action(self, state, opponent, type):
+        options = ACTIONS[type]
+        min_raise = self.min_raise(state, opponent)
+        prompt = {"type": "act", "options": list(options), "to_call": opponent.current_bet - self.current_bet,
+                  "min_raise": min_raise, "pot": state.pot, "chips": self.chips}
+        while True:
+            message = self.session.request(prompt)
+            action = message.get("action")
+            if action not in options:
+                self.session.post({"type": "error", "message": f"action must be one of {list(options)}"})
+                continue
+            if action == "raise":
+                amount = self.parse_raise(message.get("amount"), opponent, min_raise)
+                if amount is None:
+                    self.session.post({"type": "error", "message": f"raise must be 'all in' or a number from "
+                                                                   f"{min_raise} to {self.chips}"})
+                    continue
+                self.raise_amount = amount
+            return action
+
+    def min_raise(self, state, opponent):
+        # The console player's rule, twice the opponent's bet, with the big blind as the smallest opening bet
+        return max(2 * opponent.current_bet, state.big_blind)
+
+    def parse_raise(self, amount, opponent, min_raise):
+        # A number from min_raise up to the player's chips, or "all in" capped at the opponent's stack
+        if amount == "all in":
+            if self.chips > opponent.chips:
+                return opponent.chips + (opponent.current_bet - self.current_bet)
+            return self.chips
+        if isinstance(amount, (int, float)) and not isinstance(amount, bool) and min_raise <= amount <= self.chips:
+            return amount
+        return None
+
+    def choose_raise(self, state, opponent):
+        self.bet(self.raise_amount)
+        return self.raise_amount
+
+
+class Session:
+    # One connection. Runs on the event loop; request() and post() are called from the table thread.
+    def __init__(self, server, reader, writer):
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.loop = asyncio.get_running_loop()
+        self.pending = None  # Future for the move the table thread is waiting on
+        self.closed = False
+
+    def send(self, message):
+        if not self.closed:
+            self.writer.write(json.dumps(message).encode() + b"\n")
+
+    def post(self, message):
+        self.loop.call_soon_threadsafe(self.send, message)
+
+    def request(self, prompt):
+        # From the table thread: send the prompt and wait for the client's answer
+        return asyncio.run_coroutine_threadsafe(self.ask(prompt), self.loop).result()
+
+    async def ask(self, prompt):
+        if self.closed:
+            raise Disconnected()
+        self.pending = self.loop.create_future()
+        self.send(prompt)
+        try:
+            return await self.pending
+        finally:
+            self.pending = None
+
+    async def read(self):
+        try:
+            line = await self.reader.readline()
+        except ConnectionError:  # Includes a write to a client that has gone, which surfaces here
+            return None
+        if not line:
+            return None
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            self.send({"type": "error", "message": "expected one JSON object per line"})
+            return {}
+        return message if isinstance(message, dict) else {}
+
+    async def run(self):
+        game = None
+        try:
+            while True:
+                message = await self.read()
+                if message is None or message.get("type") == "quit":
+                    break
+                kind = message.get("type")
+                if kind == "join":
+                    if game is not None and not game.done():
+                        self.send({"type": "error", "message": "already in a game"})
+                    else:
+                        game = asyncio.ensure_future(self.server.play_game(self, message))
+                elif kind == "action" and self.pending is not None and not self.pending.done():
+                    self.pending.set_result(message)
+                else:
+                    self.send({"type": "error", "message": f"unexpected {kind!r} message"})
+        finally:
+            self.closed = True
+            if self.pending is not None and not self.pending.done():
+                self.pending.set_exception(Disconnected())
+            if game is not None:
+                await asyncio.gather(game, return_exceptions=True)
+            self.writer.close()
+
+
+class GameServer:
+    def __init__(self, max_tables=MAX_TABLES, bot_config=None, metrics=None):
+        self.max_tables = max_tables
+        self.bot_config = dict(BOT_CONFIG, **(bot_config or {}))
+        self.metrics = metrics or Metrics()
+        self.executor = ThreadPoolExecutor(max_workers=max_tables, thread_name_prefix="table")
+        self.tables = asyncio.Semaphore(max_tables)  # Games beyond max_tables wait for a free table
+        self.table_ids = 0
+        self.active = 0
+        self.sessions = set()
+
+    async def handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.sessions.add(task)
+        try:
+            await Session(self, reader, writer).run()
+        finally:
+            self.sessions.discard(task)
+
+    async def play_game(self, session, join):
+        buyin = join.get("buyin", 1000)
+        if not isinstance(buyin, (int, float)) or isinstance(buyin, bool) or buyin <= 0:
+            session.send({"type": "error", "message": "buyin must be a positive number"})
+            return
+        config = dict(self.bot_config, **{key: join[key] for key in JOIN_OPTIONS if key in join})
+        async with self.tables:
+            self.table_ids += 1
+            self.active += 1
+            self.metrics.count("tables_started_total")
+            session.send({"type": "welcome", "table": self.table_ids})
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.run_table, session, str(join.get("name", "Player")), buyin, config)
+            except Disconnected:
+                self.metrics.count("tables_abandoned_total")
+            except Exception as exc:  # A bug in a table must not take down the server or the other tables
+                self.metrics.count("tables_failed_total")
+                session.send({"type": "error", "message": f"table stopped: {exc!r}"})
+            finally:
+                self.active -= 1
+
+    def run_table(self, session, name, buyin, config):
+        # Runs in an executor thread for the whole game
+        player = RemotePlayer(name, buyin, session)
+        bot = AIPlayer("AI Bot", buyin, metrics=self.metrics, **config)
+        table = Table(player, bot, buyin / 100, buyin / 50, listener=lambda event, state, **details:
+                      self.forward(session, player, event, state, **details))
+        while not table.game_over():
+            table.play_hand()
+            self.metrics.count("hands_played_total")
+        session.post({"type": "game_over", "winner": player.name if player.chips > 0 else bot.name})
+
+    def forward(self, session, remote, event, state, **details):
+        # Table listener: turns engine events into protocol messages for the remote player
+        if event == "hand_start":
+            message = {"hand": state.hand_num, "dealer": state.dealer.name, "small_blind": state.small_blind,
+                       "big_blind": state.big_blind, "hole": cards_json(remote.hand),
+                       "chips": {p.name: p.chips for p in (state.player1, state.player2)}}
+        elif event == "blinds":
+            message = {"pot": state.pot}
+        elif event == "deal":
+            message = {"street": STREETS[state.street], "board": cards_json(state.community_cards)}
+        elif event == "action":
+            message = {"player": details["player"].name, "action": details["action"], "amount": details["amount"],
+                       "pot": state.pot}
+        elif event == "result":
+            message = {"winner": state.winner.name if state.winner else None, "pot": state.pot}
+            if not (state.player1.folded or state.player2.folded):
+                message["hands"] = {p.name: cards_json(p.hand) for p in (state.player1, state.player2)}
+        else:
+            message = {"chips": {p.name: p.chips for p in (state.player1, state.player2)}}
+        message["type"] = event
+        session.post(message)
+
+    async def serve(self, host="127.0.0.1", port=7777, unix=None):
+        # Build the evaluator tables up front rather than inside the first tables' decisions
+        build_tables()
+        if np is not None:
+            build_array_tables()
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        return server
+
+    async def drain(self):
+        # Waits for the connections still open to finish their games, e.g. after the clients have quit
+        await asyncio.gather(*self.sessions, return_exceptions=True)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def main(args):
+    server = GameServer(args.max_tables, json.loads(args.bot_config) if args.bot_config else None)
+    listener = await server.serve(args.host, args.port, args.unix)
+    if args.metrics_port:
+        server.metrics.serve(args.metrics_port)
+    print(f"serving on {args.unix or f'{args.host}:{args.port}'} with up to {args.max_tables} tables")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7777)
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-tables", type=int, default=MAX_TABLES)
+    parser.add_argument("--bot-config", help="JSON object of AIPlayer keyword arguments")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,271 @@
+# Abstracted strategy table for AIPlayer(strategy=True): an action and raise size per bucket of spots, solved
+# offline, so a decision is a table lookup with no equity simulation.
+#
+# A spot is bucketed by street, board texture (misc.texture), pot-odds band, decision type (the engine's 1, 2 or
+# 3, which says whether the player faces a bet or an all in) and hand strength: the share of the opponent's
+# possible hands the player's hand beats right now (preflop, its percentile by preflop equity). Each bucket of
+# (street, texture, pot odds, type) is solved as a one-decision game: the player moves, the opponent answers a
+# raise by folding or calling with its own strength bucket, and called or checked hands go to showdown. How
+# often each pair of strength buckets meets and who wins the showdown are sampled from random deals. The games
+# are solved with CFR+ (regret matching on NumPy arrays, linear averaging) over a process pool, and the average
+# strategies are written to data/strategy.bin, which is memory-mapped on first use.
+#
+#   python -m misc.strategy [--samples N] [--iterations N] [--workers N]
+import argparse
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from misc.deck import CARDS
+from misc.equity import live_cards, make_rng, np, pair_indices, worker_seeds
+from misc.hand_evaluator import BoardState
+from misc.ranges import preflop_score
+from misc.texture import TEXTURES, board_texture
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "strategy.bin")
+# magic, version, strength buckets, pot-odds bands, sampled deals per street, CFR iterations
+HEADER = struct.Struct("<4sHHHII")
+MAGIC = b"STRT"
+VERSION = 1
+
+BOARD_SIZES = (0, 3, 4, 5)  # Community cards on each street
+STRENGTH_BUCKETS = 8
+POT_ODDS = (0.0, 0.2, 0.3)  # Lower edge of each pot-odds band; type 1 spots (nothing to call) are all in the first
+POT_ODDS_POINTS = (0.0, 0.15, 0.25, 0.4)  # The pot odds each band is solved at
+TYPES = (1, 2, 3)
+MOVES = ("fold", "check", "call", "raise_half", "raise_pot")
+RAISE_SIZES = {"raise_half": 0.5, "raise_pot": 1.0}  # Raise beyond the call, as a share of the pot after calling
+TYPE_MOVES = {1: ("check", "raise_half", "raise_pot"), 2: ("call", "fold"), 3: ("call", "raise_half", "raise_pot", "fold")}
+MIN_SAMPLES = 500  # Textures seen less often than this on a street are solved with the street's pooled counts
+
+_table = None  # float32 view of the mapped file, loaded on first use
+_load_failed = False
+_preflop_strengths = None  # Sorted preflop scores of all 1326 starting hands
+
+
+def preflop_strength(hand):
+    # Percentile of the hand among all starting hands, ranked by preflop equity when data/preflop_equity.bin is
+    # there (misc.ranges.preflop_score)
+    global _preflop_strengths
+    if _preflop_strengths is None:
+        _preflop_strengths = sorted(preflop_score(combo) for combo in combinations(CARDS, 2))
+    return (bisect_left(_preflop_strengths, preflop_score(hand)) + 0.5) / len(_preflop_strengths)
+
+
+def hand_strength(hand, community_cards):
+    # Share of the opponent's possible hands that hand beats on this board, ties counting half
+    if not community_cards:
+        return preflop_strength(hand)
+    board = BoardState(community_cards)
+    hero = board.add(hand).evaluate(())
+    live = live_cards(list(hand) + list(community_cards))
+    if np is not None:
+        villains = board.evaluate_batch(np.array(live)[pair_indices(len(live))])
+        return float(((villains < hero).sum() + 0.5 * (villains == hero).sum()) / len(villains))
+    score = total = 0
+    for pair in combinations(live, 2):
+        villain = board.evaluate(pair)
+        score += 1.0 if hero > villain else 0.5 if hero == villain else 0.0
+        total += 1
+    return score / total
+
+
+def strength_bucket(strength):
+    return min(int(strength * STRENGTH_BUCKETS), STRENGTH_BUCKETS - 1)
+
+
+def pot_odds_band(pot_odds):
+    return max(i for i, edge in enumerate(POT_ODDS) if pot_odds >= edge)
+
+
+def entry_index(street, texture, band, type):
+    return (((street * len(TEXTURES) + TEXTURES.index(texture)) * len(POT_ODDS) + band) * len(TYPES)
+            + TYPES.index(type)) * STRENGTH_BUCKETS * len(MOVES)
+
+
+def _sample_task(street, samples, stream):
+    # Strength-bucket pair counts and hero showdown shares by texture, for `samples` random deals on one street
+    rng = make_rng(stream)
+    known = BOARD_SIZES[street]
+    shape = (len(TEXTURES), STRENGTH_BUCKETS, STRENGTH_BUCKETS)
+    counts, shares = np.zeros(shape), np.zeros(shape)
+    for _ in range(samples):
+        cards = [CARDS[i] for i in rng.choice(52, 9, replace=False)]
+        hero, villain, board, runout = cards[:2], cards[2:4], cards[4:4 + known], cards[4:9]
+        texture = TEXTURES.index(board_texture(board)) if board else 0
+        i, j = strength_bucket(hand_strength(hero, board)), strength_bucket(hand_strength(villain, board))
+        final = BoardState(runout)
+        hero_final, villain_final = final.evaluate(hero), final.evaluate(villain)
+        counts[texture, i, j] += 1
+        shares[texture, i, j] += 1.0 if hero_final > villain_final else 0.5 if hero_final == villain_final else 0.0
+    return street, counts, shares
+
+
+def regret_match(regrets):
+    # Strategy in proportion to positive regret, uniform where there is none
+    positive = np.maximum(regrets, 0.0)
+    total = positive.sum(axis=-1, keepdims=True)
+    uniform = np.full_like(positive, 1.0 / positive.shape[-1])
+    return np.where(total > 0, positive / np.where(total > 0, total, 1.0), uniform)
+
+
+def solve(joint, showdown, type, pot_odds, iterations):
+    # CFR+ on one bucket's game, from the player's point of view with the pot normalised to 1 and folding worth
+    # 0. joint[i, j]: chance the player holds strength bucket i and the opponent j; showdown[i, j]: the player's
+    # share of the pot at showdown. Returns the average strategy, (STRENGTH_BUCKETS, moves of this type).
+    pot = 1.0
+    to_call = 0.0 if type == 1 else pot_odds * pot / (1.0 - pot_odds)
+    moves = TYPE_MOVES[type]
+    fixed = {"fold": np.zeros_like(showdown), "check": showdown * pot, "call": showdown * (pot + to_call) - to_call}
+    called = {}  # Payoff of a raise the opponent calls
+    for move, size in RAISE_SIZES.items():
+        raise_by = size * (pot + to_call)
+        called[move] = showdown * (pot + to_call + 2 * raise_by) - (to_call + raise_by)
+
+    hero_regrets = np.zeros((STRENGTH_BUCKETS, len(moves)))
+    hero_total = np.zeros_like(hero_regrets)
+    answer_regrets = {move: np.zeros((STRENGTH_BUCKETS, 2)) for move in moves if move in called}  # fold, call
+    for iteration in range(1, iterations + 1):
+        hero = regret_match(hero_regrets)
+        answers = {move: regret_match(regrets) for move, regrets in answer_regrets.items()}
+        values = np.empty_like(hero_regrets)
+        for k, move in enumerate(moves):
+            if move in called:
+                payoff = answers[move][:, 0][None, :] * pot + answers[move][:, 1][None, :] * called[move]
+            else:
+                payoff = fixed[move]
+            values[:, k] = (joint * payoff).sum(axis=1)
+        hero_regrets = np.maximum(hero_regrets + values - (hero * values).sum(axis=1, keepdims=True), 0.0)
+        hero_total += iteration * hero
+
+        # The opponent's counterfactual values are the player's payoffs negated, weighted by how often each
+        # player bucket makes this raise
+        for k, move in enumerate(moves):
+            if move not in called:
+                continue
+            reach = joint * hero[:, k][:, None]
+            answer_values = np.stack([-(reach * pot).sum(axis=0), -(reach * called[move]).sum(axis=0)], axis=1)
+            node = (answers[move] * answer_values).sum(axis=1, keepdims=True)
+            answer_regrets[move] = np.maximum(answer_regrets[move] + answer_values - node, 0.0)
+    return hero_total / hero_total.sum(axis=1, keepdims=True)
+
+
+def _solve_task(key, joint, showdown, iterations):
+    street, texture, band, type = key
+    return key, solve(joint, showdown, type, POT_ODDS_POINTS[band], iterations)
+
+
+def store(table, key, policy):
+    start = entry_index(*key)
+    rows = table[start:start + STRENGTH_BUCKETS * len(MOVES)].reshape(STRENGTH_BUCKETS, len(MOVES))
+    for k, move in enumerate(TYPE_MOVES[key[3]]):
+        rows[:, MOVES.index(move)] = policy[:, k]
+
+
+def build_table(path=TABLE_PATH, samples=20000, iterations=2000, workers=None, seed=0):
+    if np is None:
+        raise RuntimeError("building the strategy table needs NumPy")
+    workers = workers or os.cpu_count() or 1
+    chunks = max(workers, 1)
+    streams = worker_seeds(seed, len(BOARD_SIZES) * chunks)
+    shape = (len(TEXTURES), STRENGTH_BUCKETS, STRENGTH_BUCKETS)
+    counts = [np.zeros(shape) for _ in BOARD_SIZES]
+    shares = [np.zeros(shape) for _ in BOARD_SIZES]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_sample_task, street, samples // chunks + (c < samples % chunks),
+                               streams[street * chunks + c])
+                   for street in range(len(BOARD_SIZES)) for c in range(chunks)]
+        for future in futures:
+            street, chunk_counts, chunk_shares = future.result()
+            counts[street] += chunk_counts
+            shares[street] += chunk_shares
+        print(f"sampled {samples} deals per street")
+
+        spots = {}  # (street, texture) -> (joint, showdown)
+        for street in range(len(BOARD_SIZES)):
+            pooled_counts, pooled_shares = counts[street].sum(axis=0), shares[street].sum(axis=0)
+            for t, texture in enumerate(TEXTURES):
+                if counts[street][t].sum() >= MIN_SAMPLES:
+                    seen, won = counts[street][t], shares[street][t]
+                else:
+                    seen, won = pooled_counts, pooled_shares
+                spots[street, texture] = seen / seen.sum(), np.where(seen > 0, won / np.maximum(seen, 1), 0.5)
+
+        # Nothing to call first: the same game in every pot-odds band. Its solution then says which opponent
+        # buckets bet, and the games that face a bet are solved against those buckets only.
+        table = np.zeros(len(BOARD_SIZES) * len(TEXTURES) * len(POT_ODDS) * len(TYPES) * STRENGTH_BUCKETS * len(MOVES),
+                         dtype=np.float32)
+        first = {key: pool.submit(_solve_task, key + (0, 1), joint, showdown, iterations)
+                 for key, (joint, showdown) in spots.items()}
+        games = []
+        for key, future in first.items():
+            _, unopened = future.result()
+            for band in range(len(POT_ODDS)):
+                store(table, key + (band, 1), unopened)
+            joint, showdown = spots[key]
+            facing = joint * (1.0 - unopened[:, TYPE_MOVES[1].index("check")])[None, :]
+            facing /= facing.sum()
+            games += [pool.submit(_solve_task, key + (band, type), facing, showdown, iterations)
+                      for band in range(len(POT_ODDS)) for type in (2, 3)]
+        for future in games:
+            store(table, *future.result())
+        print(f"{len(first) + len(games)} games solved")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, STRENGTH_BUCKETS, len(POT_ODDS), samples, iterations))
+        f.write(table.tobytes())
+    os.replace(path + ".tmp", path)
+
+
+def load_table(path=TABLE_PATH):
+    global _table, _load_failed
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        _load_failed = True
+        return None
+    magic, version, buckets, bands, _, _ = HEADER.unpack_from(mapped)
+    if magic != MAGIC or version != VERSION or buckets != STRENGTH_BUCKETS or bands != len(POT_ODDS):
+        _load_failed = True
+        return None
+    _table = memoryview(mapped)[HEADER.size:].cast("f")
+    return _table
+
+
+def policy(street, texture, pot_odds, type, strength):
+    # {move: probability} over the legal moves of this type, or None if the table has not been built
+    if _table is None and (_load_failed or load_table() is None):
+        return None
+    start = entry_index(street, texture, pot_odds_band(pot_odds) if type != 1 else 0, type)
+    start += strength_bucket(strength) * len(MOVES)
+    return {move: _table[start + MOVES.index(move)] for move in TYPE_MOVES[type]}
+
+
+def choose_move(moves, rng):
+    # Draws a move from a policy() result with a random.Random
+    point = rng.random()
+    for move, probability in moves.items():
+        point -= probability
+        if point < 0:
+            return move
+    return move
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=TABLE_PATH)
+    parser.add_argument("--samples", type=int, default=20000, help="random deals per street")
+    parser.add_argument("--iterations", type=int, default=2000, help="CFR+ iterations per game")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    build_table(args.output, args.samples, args.iterations, args.workers, args.seed)
+    load_table(args.output)
+    for strength in (0.1, 0.5, 0.95):
+        moves = policy(1, "safe", 0.25, 3, strength)
+        print(f"flop, safe board, facing a bet at 25% pot odds, strength {strength}: "
+              + ", ".join(f"{move} {p:.2f}" for move, p in moves.items()))
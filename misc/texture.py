@@ -0,0 +1,168 @@
+# Board textures for every flop, turn and river, precomputed into data/board_texture.bin and memory-mapped.
+# A board's texture depends only on its ranks and on how many cards its longest suit has, so all suit
+# relabellings (and every board with the same rank multiset and suit spread) share one entry. Entries are found by
+# arithmetic on the sorted ranks rather than by hashing, so a lookup is a few integer operations and one read.
+# Rebuild: python -m misc.texture
+import argparse
+import mmap
+import os
+import struct
+from collections import namedtuple
+from itertools import combinations_with_replacement
+from math import comb
+from misc.deck import RANK_OF, SUIT_OF
+from misc.hand_evaluator import STRAIGHT_MASKS
+
+INDEX_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "board_texture.bin")
+HEADER = struct.Struct("<4sHI")  # magic, version, number of entries
+MAGIC = b"BTEX"
+VERSION = 1
+BOARD_SIZES = (3, 4, 5)
+# First entry of each board size: one entry per (rank multiset, longest suit) pair
+OFFSETS = {}
+_offset = 0
+for _size in BOARD_SIZES:
+    OFFSETS[_size] = _offset
+    _offset += comb(13 + _size - 1, _size) * _size
+NUM_ENTRIES = _offset
+RANK_TERMS = [[comb(rank + i, i + 1) for rank in range(13)] for i in range(5)]  # index_of's terms, by position
+
+TEXTURES = ("safe", "flush_draw", "straight_draw", "dangerous")  # AIPlayer.board_texture's classes
+PAIRING = ("unpaired", "paired", "two_pair", "trips", "full_house", "quads")
+HIGH_CARDS = ("low", "middle", "broadway", "ace_high")  # Top card 6 or lower, 7 to 9, T to K, ace
+
+# Each entry packs the features into 32 bits: (name, shift, width)
+FIELDS = (("texture", 0, 2), ("suits", 2, 3), ("pairing", 5, 3), ("straights", 8, 4), ("connected", 12, 3),
+          ("top", 15, 4))
+
+BoardFeatures = namedtuple("BoardFeatures", "texture suits pairing straights connected high_card")
+# texture: one of TEXTURES. suits: cards in the longest suit, so 1 is rainbow and a flop of 3 monotone.
+# pairing: one of PAIRING. straights: straight ranks (of the 10) that two hole cards can still complete.
+# connected: most board cards inside any one straight's five ranks. high_card: one of HIGH_CARDS.
+
+_index = None  # Mapped entries, loaded (or built in memory if the file is missing) on first use
+
+
+def index_of(ranks, suits):
+    # ranks: the board's rank indexes (0-12) in ascending order; suits: cards in its longest suit.
+    # The sorted multiset is numbered by the combinatorial number system on ranks[i] + i.
+    position = 0
+    for terms, rank in zip(RANK_TERMS, ranks):
+        position += terms[rank]
+    return OFFSETS[len(ranks)] + position * len(ranks) + suits - 1
+
+
+def classify(ranks, suits):
+    # AIPlayer.board_texture's rules, on the rank values (2-14) and the longest suit
+    distinct = sorted(set(ranks))
+    if suits >= 4 or (len(distinct) >= 4 and any(distinct[i + 3] - distinct[i] <= 4 for i in range(len(distinct) - 3))):
+        return "dangerous"
+    if suits == 3:
+        return "flush_draw"
+    if any(distinct[i + 2] - distinct[i] <= 4 for i in range(len(distinct) - 2)):
+        return "straight_draw"
+    return "safe"
+
+
+def pairing(ranks):
+    counts = sorted((ranks.count(rank) for rank in set(ranks)), reverse=True)
+    if counts[0] == 4:
+        return "quads"
+    if counts[0] == 3:
+        return "full_house" if len(counts) > 1 and counts[1] >= 2 else "trips"
+    if counts[0] == 2:
+        return "two_pair" if counts[1] == 2 else "paired"
+    return "unpaired"
+
+
+def high_card(top):
+    if top == 12:
+        return "ace_high"
+    if top >= 8:
+        return "broadway"
+    return "middle" if top >= 5 else "low"
+
+
+def features(ranks, suits):
+    # Features of a board with these rank indexes (0-12) and longest suit, computed directly
+    mask = 0
+    for rank in ranks:
+        mask |= 1 << rank
+    windows = [bin(mask & window).count("1") for window, _ in STRAIGHT_MASKS]
+    return BoardFeatures(classify([rank + 2 for rank in ranks], suits), suits, pairing(list(ranks)),
+                         sum(count >= 3 for count in windows), max(windows), high_card(max(ranks)))
+
+
+def pack(board_features, top):
+    values = {"texture": TEXTURES.index(board_features.texture), "suits": board_features.suits,
+              "pairing": PAIRING.index(board_features.pairing), "straights": board_features.straights,
+              "connected": board_features.connected, "top": top}
+    return sum(values[name] << shift for name, shift, _ in FIELDS)
+
+
+def build_entries():
+    entries = [0] * NUM_ENTRIES
+    for size in BOARD_SIZES:
+        for ranks in combinations_with_replacement(range(13), size):
+            if max(ranks.count(rank) for rank in ranks) > 4:
+                continue
+            for suits in range(1, size + 1):
+                entries[index_of(ranks, suits)] = pack(features(ranks, suits), ranks[-1])
+    return entries
+
+
+def build_index(path=INDEX_PATH):
+    entries = build_entries()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, NUM_ENTRIES))
+        f.write(struct.pack(f"<{NUM_ENTRIES}I", *entries))
+    os.replace(path + ".tmp", path)
+
+
+def load_index(path=INDEX_PATH):
+    global _index
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_entries = HEADER.unpack_from(mapped)
+        if magic != MAGIC or version != VERSION or num_entries != NUM_ENTRIES:
+            raise ValueError(f"{path} is not a version {VERSION} board texture index")
+        _index = memoryview(mapped)[HEADER.size:].cast("I")
+    except (OSError, ValueError, struct.error):
+        _index = build_entries()  # Cheap enough to build in memory when the file is missing or stale
+    return _index
+
+
+def entry(community_cards):
+    if _index is None:
+        load_index()
+    suit_counts = [0, 0, 0, 0]
+    for card in community_cards:
+        suit_counts[SUIT_OF[card]] += 1
+    return _index[index_of(sorted(RANK_OF[card] for card in community_cards), max(suit_counts))]
+
+
+def field(value, name):
+    for field_name, shift, width in FIELDS:
+        if field_name == name:
+            return value >> shift & (1 << width) - 1
+
+
+def board_texture(community_cards):
+    # AIPlayer.board_texture's class of a flop, turn or river
+    return TEXTURES[entry(community_cards) & 3]
+
+
+def board_features(community_cards):
+    value = entry(community_cards)
+    return BoardFeatures(TEXTURES[field(value, "texture")], field(value, "suits"), PAIRING[field(value, "pairing")],
+                         field(value, "straights"), field(value, "connected"), high_card(field(value, "top")))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", default=INDEX_PATH)
+    args = parser.parse_args()
+    build_index(args.output)
+    print(f"wrote {NUM_ENTRIES} entries ({os.path.getsize(args.output):,} bytes) to {args.output}")
@@ -0,0 +1,125 @@
+# Heads-up bot-vs-bot tournaments between AIPlayer configurations, over a process pool.
+# Every deal is played twice with the seats swapped (duplicate poker), so card luck cancels out.
+# Results stream to a JSON lines file, one line per finished block, and a rerun skips finished blocks.
+#
+#   python -m misc.tournament --aggressiveness 0.3 0.5 0.7 --hands 1000000 --workers 8 --output results.jsonl
+#   python -m misc.tournament --configs configs.json ...   (configs.json: {"name": {AIPlayer keyword arguments}})
+import argparse
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from misc.deck import Deck
+from misc.engine import Table
+from misc.player import AIPlayer
+
+STACK = 1000
+SMALL_BLIND = 5
+BIG_BLIND = 10
+BLOCK_DEALS = 500
+# Bot settings for tournaments: cheap sampled equity so millions of hands stay affordable; configs override them
+BASE_CONFIG = {"num_simulations": 500, "exact_threshold": 0}
+Z_95 = 1.96
+
+
+def play_block(config1, config2, block_seed, deals):
+    # Plays `deals` duplicate pairs of hands; returns the deal count and the sum and sum of squares of
+    # config1's average winnings per duplicate pair, in big blinds
+    rng = random.Random(block_seed)
+    bot1 = AIPlayer("Bot 1", STACK, seed=rng.getrandbits(32), **dict(BASE_CONFIG, **config1))
+    bot2 = AIPlayer("Bot 2", STACK, seed=rng.getrandbits(32), **dict(BASE_CONFIG, **config2))
+    total = squares = 0.0
+    for deal in range(deals):
+        deal_seed = rng.getrandbits(64)
+        net = 0.0
+        for seats in ((bot1, bot2), (bot2, bot1)):
+            table = Table(seats[0], seats[1], SMALL_BLIND, BIG_BLIND)
+            table.dealer = seats[deal % 2]  # Alternate the dealer seat between deals, as the console game does
+            bot1.chips = bot2.chips = STACK
+            table.play_hand(Deck(random.Random(deal_seed)))
+            net += bot1.chips - STACK
+        result = net / 2 / BIG_BLIND
+        total += result
+        squares += result * result
+    return deals, total, squares
+
+
+def summarize(deals, total, squares):
+    # bb/100 hands with a 95% confidence interval half-width
+    mean = total / deals
+    variance = max(squares / deals - mean * mean, 0.0) * deals / max(deals - 1, 1)
+    return mean * 100, Z_95 * (variance / deals) ** 0.5 * 100
+
+
+def read_results(path):
+    done = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:  # A line cut short by an interruption
+                    continue
+                done[(record["player1"], record["player2"], record["block"])] = record
+    return done
+
+
+def run_tournament(configs, hands, output, workers=None, seed=0, block_deals=BLOCK_DEALS):
+    # hands per matchup; each block plays block_deals deals, i.e. 2 * block_deals hands
+    blocks = max(1, hands // (2 * block_deals))
+    done = read_results(output)
+    totals = {}
+    for (name1, name2, _), record in done.items():
+        matchup = totals.setdefault((name1, name2), [0, 0.0, 0.0])
+        matchup[0] += record["deals"]
+        matchup[1] += record["sum"]
+        matchup[2] += record["sum_squares"]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, open(output, "a") as log:
+        futures = {}
+        for name1, name2 in combinations(sorted(configs), 2):
+            for block in range(blocks):
+                if (name1, name2, block) not in done:
+                    future = pool.submit(play_block, configs[name1], configs[name2], f"{seed}-{name1}-{name2}-{block}", block_deals)
+                    futures[future] = (name1, name2, block)
+
+        for future in as_completed(futures):
+            name1, name2, block = futures[future]
+            deals, total, squares = future.result()
+            matchup = totals.setdefault((name1, name2), [0, 0.0, 0.0])
+            matchup[0] += deals
+            matchup[1] += total
+            matchup[2] += squares
+            bb100, ci = summarize(*matchup)
+            log.write(json.dumps({"player1": name1, "player2": name2, "block": block, "deals": deals, "sum": total,
+                                  "sum_squares": squares, "hands_so_far": 2 * matchup[0], "bb100": bb100, "ci95": ci}) + "\n")
+            log.flush()
+            print(f"{name1} vs {name2}: {bb100:+.2f} ± {ci:.2f} bb/100 over {2 * matchup[0]} hands")
+    return {matchup: summarize(*values) for matchup, values in totals.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--configs", help="JSON file mapping config names to AIPlayer keyword arguments")
+    parser.add_argument("--aggressiveness", type=float, nargs="+", help="sweep these aggressiveness values")
+    parser.add_argument("--hands", type=int, default=100000, help="hands per matchup")
+    parser.add_argument("--output", default="tournament_results.jsonl")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--block-deals", type=int, default=BLOCK_DEALS)
+    args = parser.parse_args()
+
+    configs = {}
+    if args.configs:
+        with open(args.configs) as f:
+            configs.update(json.load(f))
+    for aggressiveness in args.aggressiveness or []:
+        configs[f"agg{aggressiveness}"] = {"aggressiveness": aggressiveness}
+    if len(configs) < 2:
+        parser.error("need at least two configurations")
+
+    results = run_tournament(configs, args.hands, args.output, args.workers, args.seed, args.block_deals)
+    print("\nFinal results (player1 winnings):")
+    for (name1, name2), (bb100, ci) in sorted(results.items()):
+        print(f"{name1} vs {name2}: {bb100:+.2f} ± {ci:.2f} bb/100")
@@ -0,0 +1,11 @@
+from misc.deck import Card
+from misc.outs import find_outs
+
+
+def test_pocket_pair_on_unpaired_flop_has_two_set_outs():
+    # Cards that only pair the board (the kings, nines and deuces) are not outs
+    hand = [Card('♠', '7'), Card('♥', '7')]
+    board = [Card('♣', 'K'), Card('♦', '9'), Card('♥', '2')]
+    outs = find_outs(hand, board)
+    assert sorted(outs.cards) == [Card('♣', '7'), Card('♦', '7')]
+    assert set(outs.cards.values()) == {"Three of a Kind"}